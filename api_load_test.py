@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Load test for the validation HTTP API.
+
+Starts validation_api in-process with uvicorn (or targets a running server
+with --url), uploads an SRS once and then sends concurrent /validate
+requests referencing it by srs_id. Reports client-side throughput and
+latency percentiles next to the server's /metrics.
+"""
+
+import argparse
+import io
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from sample_data import SRS_EXPRESSIONS, make_sheet, make_srs
+
+
+def _csv_bytes(df):
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue().encode("utf-8")
+
+
+def run_load_test(url, requests_total, concurrency, sheet_rows=10000, backend="pandas"):
+    """
+    Upload the SRS once, then POST /validate requests_total times with the
+    given concurrency. Returns a dict of throughput/latency statistics.
+    """
+    srs_bytes = _csv_bytes(make_srs(expressions=SRS_EXPRESSIONS))
+    srs = requests.post(f"{url}/srs", files={"file": ("srs.csv", srs_bytes)}, timeout=60)
+    srs.raise_for_status()
+    srs_id = srs.json()["srs_id"]
+    payload = _csv_bytes(make_sheet(sheet_rows, error_rate=0.01))
+
+    def call(i):
+        start = time.perf_counter()
+        try:
+            response = requests.post(f"{url}/validate", params={"srs_id": srs_id, "backend": backend},
+                                     files={"file": (f"data_{i}.csv", payload)}, timeout=300)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(call, range(requests_total)))
+    elapsed = time.perf_counter() - started
+
+    latencies = np.array([latency for latency, _ in outcomes])
+    return {
+        "srs_id": srs_id,
+        "requests": requests_total,
+        "concurrency": concurrency,
+        "upload_bytes": len(payload),
+        "errors": sum(1 for _, ok in outcomes if not ok),
+        "elapsed_s": elapsed,
+        "throughput_rps": requests_total / elapsed if elapsed else float("inf"),
+        "latency_p50_s": float(np.percentile(latencies, 50)),
+        "latency_p95_s": float(np.percentile(latencies, 95)),
+        "latency_max_s": float(latencies.max()),
+    }
+
+
+def start_local_server(workers=None):
+    """
+    Serve validation_api on a free local port in a background thread.
+    Returns (server, base_url).
+    """
+    import uvicorn
+
+    from validation_api import ValidationAPI
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    api = ValidationAPI(workers=workers) if workers else ValidationAPI()
+    server = uvicorn.Server(uvicorn.Config(api, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.time() + 10
+    while not server.started and time.time() < deadline:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the validation HTTP API")
+    parser.add_argument("--url", help="target a running server instead of starting one locally")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--backend", default="pandas")
+    parser.add_argument("--workers", type=int, help="worker pool size of the local server")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if not url:
+        server, url = start_local_server(args.workers)
+    url = url.rstrip("/")
+    print(f"🎯 Validation API: {url}")
+
+    try:
+        stats = run_load_test(url, args.requests, args.concurrency, args.rows, args.backend)
+        print(f"\n📈 validate: {stats['requests']} requests @ concurrency {stats['concurrency']} "
+              f"({stats['upload_bytes'] / 1024:.0f} KiB each, srs_id {stats['srs_id']})")
+        print(f"  Throughput: {stats['throughput_rps']:.1f} req/s ({stats['elapsed_s']:.2f}s total)")
+        print(f"  Latency p50/p95/max: {stats['latency_p50_s']:.3f}s / "
+              f"{stats['latency_p95_s']:.3f}s / {stats['latency_max_s']:.3f}s")
+        print(f"  Errors: {stats['errors']}")
+
+        metrics = requests.get(f"{url}/metrics", timeout=10).json()
+        print("\n🖥️ Server metrics:")
+        for route, entry in metrics["routes"].items():
+            latency = entry["latency_ms"]
+            print(f"  {route}: {entry['count']} requests, {entry['errors']} errors, "
+                  f"p50 {latency['p50']:.1f}ms / p95 {latency['p95']:.1f}ms / max {latency['max']:.1f}ms")
+    finally:
+        if server:
+            server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,158 @@
 # ai_data_validator/app.py
+import hashlib
+import io
+import os
+import tempfile
 import streamlit as st
 import pandas as pd
 from difflib import get_close_matches
 from srs_parser import parse_srs_file
+from xlsx_inspector import inspect_xlsx
 from data_validator import validate_data_against_srs
+from column_profiler import ColumnProfiler, profile_dataframe, expected_types_from_srs
+from report_exporter import export_highlighted_xlsx, export_violations
 from ollama_agent import explain_validation_results, summarize_data_sheet
 from mongodb_service import MongoDBService
 
-mongo_service = MongoDBService()
+PAGE_SIZES = [25, 50, 100, 500]
+
+# Each pipeline stage is cached by the uploaded files' content hash, so a
+# widget interaction re-runs the script but none of the unchanged stages.
+# DataFrame arguments are underscore-prefixed (not hashed); the hash keys
+# passed next to them identify the data. Parsed sheets are cached as shared
+# resources (treated as read-only) so reruns do not copy large frames.
+
+
+@st.cache_resource
+def get_mongo_service():
+    return MongoDBService()
+
+
+def file_hash(uploaded_file):
+    """
+    SHA-256 of an uploaded file, computed once per upload
+    """
+    key = f"file_hash_{uploaded_file.file_id}"
+    if key not in st.session_state:
+        st.session_state[key] = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+    return st.session_state[key]
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def list_sheets(content_hash, filename, _content):
+    """
+    Names of the non-empty sheets, read from the workbook XML without
+    loading any sheet; None when the file cannot be inspected
+    """
+    if filename.endswith(".csv"):
+        return ["Sheet1"]
+    try:
+        return [sheet["name"] for sheet in inspect_xlsx(io.BytesIO(_content)) if sheet["columns"]]
+    except ValueError:
+        return None
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def load_sheets(content_hash, filename, _content, sheet_names=None):
+    buffer = io.BytesIO(_content)
+    buffer.name = filename
+    return parse_srs_file(buffer, sheet_names=list(sheet_names) if sheet_names is not None else None)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def profile_sheet(data_key, _data_df):
+    return profile_dataframe(_data_df)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def validate_sheet(data_key, srs_key, _data_df, _srs_df):
+    """
+    Validate and profile the sheet in one pass; returns (result_summary,
+    failed_rules, column_profile)
+    """
+    profiler = ColumnProfiler(expected_types=expected_types_from_srs(_srs_df))
+    result_summary, failed_rules = validate_data_against_srs(_data_df, _srs_df, profiler=profiler)
+    return result_summary, failed_rules, profiler.result()
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def build_report_files(data_key, srs_key, sheet_name, _data_df, _srs_df):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        xlsx_path = os.path.join(tmp_dir, "report.xlsx")
+        violations_path = os.path.join(tmp_dir, "violations.parquet")
+        export_highlighted_xlsx(_data_df, _srs_df, xlsx_path, sheet_name=sheet_name)
+        export_violations(_data_df, _srs_df, violations_path)
+        with open(xlsx_path, "rb") as f:
+            xlsx_bytes = f.read()
+        with open(violations_path, "rb") as f:
+            violations_bytes = f.read()
+    return xlsx_bytes, violations_bytes
+
+
+# The AI helpers raise on failure: st.cache_data does not cache exceptions,
+# so an unreachable model is retried on the next open instead of cached
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_explanation(data_key, srs_key, sheet_name, _failed_rules):
+    return explain_validation_results(sheet_name, _failed_rules, raise_errors=True)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_summary(data_key, srs_key, sheet_name, _data_df, _column_profile):
+    return summarize_data_sheet(_data_df, sheet_name, profile=_column_profile, raise_errors=True)
+
+
+def write_ai_text(what, generate, *args):
+    try:
+        st.write(generate(*args))
+    except Exception as e:
+        st.error(f"❌ Error getting AI {what}: {e}")
+
+
+def render_failure_table(failed_rules, key):
+    """
+    Filterable, paginated failure table; only the current page is sent to
+    the browser
+    """
+    failures = pd.DataFrame(failed_rules)
+    failures["column"] = failures["column"].astype(str)
+    if "sample_rows" in failures:
+        failures["sample_rows"] = failures["sample_rows"].map(
+            lambda rows: ", ".join(map(str, rows)) if isinstance(rows, list) else "")
+
+    page_key = f"{key}_page"
+
+    def first_page():
+        st.session_state[page_key] = 1
+
+    filter_col, search_col, size_col = st.columns([2, 2, 1])
+    with filter_col:
+        columns = st.multiselect("Columns", sorted(failures["column"].unique()), key=f"{key}_columns",
+                                 on_change=first_page)
+    with search_col:
+        search = st.text_input("Error contains", key=f"{key}_search", on_change=first_page)
+    with size_col:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, key=f"{key}_page_size", on_change=first_page)
+
+    if columns:
+        failures = failures[failures["column"].isin(columns)]
+    if search:
+        failures = failures[failures["error"].str.contains(search, case=False, regex=False)]
+
+    pages = max(1, -(-len(failures) // page_size))
+    if st.session_state.get(page_key, 1) > pages:
+        first_page()
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key=page_key)
+    start = (page - 1) * page_size
+    st.dataframe(failures.iloc[start:start + page_size], use_container_width=True, hide_index=True)
+    st.caption(f"Showing {min(start + 1, len(failures))}–{min(start + page_size, len(failures))} "
+               f"of {len(failures)} failures ({len(failed_rules)} total)")
+
 
 st.set_page_config(page_title="AI Data Validator", layout="wide")
 st.title("📊 Multi-Sheet AI Data Validator (Pension Fund Edition)")
 
+mongo_service = get_mongo_service()
+
 # MongoDB sidebar status
 with st.sidebar:
     st.header("🗄️ Database Status")
@@ -30,56 +171,90 @@ srs_file = st.file_uploader("📥 Upload the SRS File (.csv or .xlsx)", type=["c
 data_file = st.file_uploader("📥 Upload the Data File (.csv or .xlsx)", type=["csv", "xlsx"], key="data")
 
 if srs_file and data_file:
+    srs_hash = file_hash(srs_file)
+    data_hash = file_hash(data_file)
     with st.spinner("Reading files and matching sheets..."):
-        srs_dict = parse_srs_file(srs_file)
-        data_dict = parse_srs_file(data_file)
+        # Match sheet names before loading so unmatched SRS sheets are never parsed
+        srs_names = list_sheets(srs_hash, srs_file.name, srs_file.getvalue())
+        data_names = list_sheets(data_hash, data_file.name, data_file.getvalue())
+        needed_srs = None
+        if srs_names is not None and data_names is not None:
+            needed_srs = tuple(sorted({match for name in data_names
+                                       for match in get_close_matches(name, srs_names, n=1, cutoff=0.6)}))
+        srs_dict = load_sheets(srs_hash, srs_file.name, srs_file.getvalue(), needed_srs)
+        data_dict = load_sheets(data_hash, data_file.name, data_file.getvalue())
 
     for sheet_name in data_dict:
         st.subheader(f"📄 Sheet: {sheet_name}")
         data_df = data_dict[sheet_name]
+        data_key = (data_hash, sheet_name)
 
         matched_srs_name = get_close_matches(sheet_name, srs_dict.keys(), n=1, cutoff=0.6)
         if matched_srs_name:
             srs_df = srs_dict[matched_srs_name[0]]
+            srs_key = (srs_hash, matched_srs_name[0])
             st.info(f"🔗 Fuzzy matched with SRS sheet: '{matched_srs_name[0]}'")
         else:
             st.warning(f"⚠️ No matching SRS sheet found for '{sheet_name}'")
             st.info(f"📊 Data Preview: {len(data_df)} rows × {len(data_df.columns)} columns")
             st.dataframe(data_df.head(), use_container_width=True)
-            with st.expander("📊 AI Data Analysis (No Validation)"):
-                with st.spinner("Generating AI analysis..."):
-                    st.write(summarize_data_sheet(data_df, sheet_name))
+            analysis = st.expander("📊 AI Data Analysis (No Validation)", key=f"analysis_{sheet_name}",
+                                   on_change="rerun")
+            if analysis.open:
+                with analysis, st.spinner("Generating AI analysis..."):
+                    column_profile = profile_sheet(data_key, data_df)
+                    write_ai_text("analysis", cached_summary, data_key, None, sheet_name, data_df, column_profile)
             continue
 
         st.info(f"📊 Data Preview: {len(data_df)} rows × {len(data_df.columns)} columns")
         st.dataframe(data_df.head(), use_container_width=True)
 
-        with st.spinner("Validating sheet..."):
-            result_summary, failed_rules = validate_data_against_srs(data_df, srs_df)
-            st.markdown("### ✅ Validation Summary")
-            st.json(result_summary)
-
-            if mongo_service.client:
-                try:
-                    mongo_service.store_validation_results(
-                        file_id=None,  # You can integrate real file_id if storing files
-                        sheet_name=sheet_name,
-                        validation_summary=result_summary,
-                        failed_rules=failed_rules
-                    )
-                except Exception as e:
-                    st.warning(f"⚠️ Could not store validation results: {str(e)}")
-
-            if failed_rules:
-                st.markdown("### ❌ Failed Validations")
-                st.table(failed_rules)
-                with st.spinner("Explaining validation results via Ollama..."):
-                    explanation = explain_validation_results(sheet_name, failed_rules)
-                    st.markdown("### 🤖 AI-Powered Explanation")
-                    st.write(explanation)
-            else:
-                st.success("🎉 All validations passed for this sheet!")
-
-        with st.expander("📊 Additional Sheet Insights (via LLM)"):
-            with st.spinner("Generating AI summary..."):
-                st.write(summarize_data_sheet(data_df, sheet_name))
\ No newline at end of file
+        with st.spinner("Validating and profiling sheet..."):
+            result_summary, failed_rules, column_profile = validate_sheet(data_key, srs_key, data_df, srs_df)
+        st.markdown("### ✅ Validation Summary")
+        st.json(result_summary)
+
+        # Store each (data, SRS) validation once, not on every rerun
+        stored_key = f"stored_{data_hash}_{srs_hash}_{sheet_name}"
+        if mongo_service.client and stored_key not in st.session_state:
+            try:
+                mongo_service.store_validation_results(
+                    file_id=None,  # You can integrate real file_id if storing files
+                    sheet_name=sheet_name,
+                    validation_summary=result_summary,
+                    failed_rules=failed_rules,
+                    column_profile=column_profile
+                )
+                st.session_state[stored_key] = True
+            except Exception as e:
+                st.warning(f"⚠️ Could not store validation results: {str(e)}")
+
+        if failed_rules:
+            st.markdown("### ❌ Failed Validations")
+            render_failure_table(failed_rules, key=f"failures_{sheet_name}")
+            with st.expander("📥 Export Annotated Report"):
+                if st.button("Prepare report files", key=f"export_{sheet_name}"):
+                    st.session_state[f"export_ready_{sheet_name}"] = True
+                if st.session_state.get(f"export_ready_{sheet_name}"):
+                    with st.spinner("Writing highlighted workbook and violations table..."):
+                        xlsx_bytes, violations_bytes = build_report_files(data_key, srs_key, sheet_name,
+                                                                          data_df, srs_df)
+                    st.download_button("⬇️ Highlighted workbook (.xlsx)", xlsx_bytes,
+                                       file_name=f"{sheet_name}_validated.xlsx",
+                                       key=f"xlsx_{sheet_name}")
+                    st.download_button("⬇️ Violations table (.parquet)", violations_bytes,
+                                       file_name=f"{sheet_name}_violations.parquet",
+                                       key=f"violations_{sheet_name}")
+            explanation = st.expander("🤖 AI-Powered Explanation", key=f"explanation_{sheet_name}",
+                                      on_change="rerun")
+            if explanation.open:
+                with explanation, st.spinner("Explaining validation results via Ollama..."):
+                    write_ai_text("explanation", cached_explanation, data_key, srs_key, sheet_name, failed_rules)
+        else:
+            st.success("🎉 All validations passed for this sheet!")
+
+        insights = st.expander("📊 Additional Sheet Insights (via LLM)", key=f"insights_{sheet_name}",
+                               on_change="rerun")
+        if insights.open:
+            with insights, st.spinner("Generating AI summary..."):
+                write_ai_text("summary", cached_summary, data_key, srs_key, sheet_name, data_df, column_profile)
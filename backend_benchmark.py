@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the validation backends.
+
+Writes a synthetic sheet (numeric, text, boolean and date columns with a
+small share of bad values) to CSV and Parquet, then times every installed
+backend from validation_backends on the same files and SRS rules, checking
+that each one returns the pandas result.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from sample_data import SRS_EXPRESSIONS, make_sheet, make_srs
+from validation_backends import available_backends, validate_file_against_srs
+
+
+def time_backend(path, srs_df, backend, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = validate_file_against_srs(path, srs_df, backend=backend)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def run_benchmark(n_rows, formats=("csv", "parquet"), backends=None, repeat=3):
+    """
+    Time each backend on an n_rows sheet in each format. Returns a list of
+    dicts: format, backend, seconds (best of repeat), rows_per_s, matches_pandas
+    """
+    backends = backends or available_backends()
+    srs_df = make_srs(expressions=SRS_EXPRESSIONS)
+    sheet = make_sheet(n_rows, error_rate=0.001)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for file_format in formats:
+            path = os.path.join(tmp_dir, f"sheet.{file_format}")
+            if file_format == "csv":
+                sheet.to_csv(path, index=False)
+            else:
+                sheet.to_parquet(path, index=False)
+            expected = None
+            for backend in ["pandas"] + [b for b in backends if b != "pandas"]:
+                seconds, result = time_backend(path, srs_df, backend, repeat)
+                if backend == "pandas":
+                    expected = result
+                results.append({
+                    "format": file_format,
+                    "backend": backend,
+                    "seconds": seconds,
+                    "rows_per_s": n_rows / seconds,
+                    "matches_pandas": result == expected,
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the validation backends")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--formats", nargs="+", default=["csv", "parquet"])
+    parser.add_argument("--backends", nargs="+", help="default: every installed backend")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"🏁 Validating {args.rows:,} rows (best of {args.repeat})")
+    for entry in run_benchmark(args.rows, args.formats, args.backends, args.repeat):
+        parity = "✅" if entry["matches_pandas"] else "❌ differs from pandas"
+        print(f"  {entry['format']:<8} {entry['backend']:<8} {entry['seconds']:7.3f}s "
+              f"{entry['rows_per_s']:>12,.0f} rows/s  {parity}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Single-pass, chunk-wise column profiler.
+
+Every statistic here is mergeable across chunks, so a sheet is profiled
+by feeding it to ColumnProfiler.update() one chunk at a time. Both
+validators accept a profiler and feed it the rows they validate, so
+profiling shares the validation pass instead of re-reading the sheet. Distinct
+counts use HyperLogLog, top-k values a count-min sketch, and quantiles a
+t-digest, so memory stays bounded regardless of the number of rows.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_validator import coerce_column, compile_srs_rules
+
+_UINT64_MASK = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def _hash_series(series):
+    """
+    64-bit hashes of the non-null values of a series
+    """
+    return pd.util.hash_pandas_object(series, index=False).to_numpy(dtype=np.uint64)
+
+
+def _to_builtin(value):
+    """
+    Convert numpy/pandas scalars into plain Python values (JSON/BSON safe)
+    """
+    if value is None:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-count estimator with 2**p registers
+    """
+
+    def __init__(self, p=12):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add_hashes(self, hashes):
+        if len(hashes) == 0:
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        idx = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        # Keep 53 of the remaining bits so the float64 exponent below is exact
+        rest = ((hashes << np.uint64(self.p)) & _UINT64_MASK) >> np.uint64(11)
+        bits = 53
+        _, exponent = np.frexp(rest.astype(np.float64))
+        rank = np.where(rest == 0, bits + 1, bits - exponent + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+
+class CountMinSketch:
+    """
+    Count-min sketch over 64-bit hashes; estimates never under-count
+    """
+
+    def __init__(self, width=2048, depth=4, seed=0):
+        self.width = width
+        self.depth = depth
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 63, size=depth, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=depth, dtype=np.uint64)
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    def _buckets(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            mixed = self._a[:, None] * hashes[None, :] + self._b[:, None]
+        return ((mixed >> np.uint64(32)) % np.uint64(self.width)).astype(np.int64)
+
+    def add_hashes(self, hashes):
+        if len(hashes) == 0:
+            return
+        buckets = self._buckets(hashes)
+        for row in range(self.depth):
+            self.table[row] += np.bincount(buckets[row], minlength=self.width)
+
+    def estimate(self, hashes):
+        if len(hashes) == 0:
+            return np.zeros(0, dtype=np.int64)
+        buckets = self._buckets(hashes)
+        return self.table[np.arange(self.depth)[:, None], buckets].min(axis=0)
+
+
+class TDigest:
+    """
+    Merging t-digest. Compression is fully vectorized: centroids are sorted,
+    mapped through the arcsine scale function and grouped per unit of k.
+    """
+
+    def __init__(self, compression=100):
+        self.compression = compression
+        self.means = np.zeros(0, dtype=np.float64)
+        self.weights = np.zeros(0, dtype=np.float64)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        means = np.concatenate([self.means, values])
+        weights = np.concatenate([self.weights, np.ones(len(values))])
+        self._compress(means, weights)
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind="mergesort")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        groups = np.floor(k).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+
+    def quantile(self, q):
+        if len(self.means) == 0:
+            return None
+        if len(self.means) == 1:
+            return float(self.means[0])
+        cumulative = (np.cumsum(self.weights) - self.weights / 2) / self.weights.sum()
+        return float(np.interp(q, cumulative, self.means))
+
+
+def expected_types_from_srs(srs_df):
+    """
+    Map of {column: declared SRS type} used for type-conformance rates
+    """
+    expected = {}
+    for rule in compile_srs_rules(srs_df):
+        if rule["column"] is not None and rule["type"] and rule["type"] != "nan":
+            expected[rule["column"]] = rule["type"]
+    return expected
+
+
+class _ColumnState:
+    def __init__(self, top_k, compression, hll_precision):
+        self.count = 0
+        self.null_count = 0
+        self.min = None
+        self.max = None
+        self.nonconforming = 0
+        self.type_checked = False
+        self.hll = HyperLogLog(hll_precision)
+        self.cms = CountMinSketch()
+        self.candidates = {}  # value -> hash, bounded to a few times top_k
+        self.digest = None
+        self.top_k = top_k
+        self.compression = compression
+
+
+class ColumnProfiler:
+    """
+    Accumulates a per-column profile over any number of chunks.
+
+    Call update(chunk) for each chunk of a sheet (each row exactly once),
+    then result() for a JSON/BSON-serializable profile that can go into the
+    LLM prompt and MongoDB as is.
+    """
+
+    def __init__(self, expected_types=None, top_k=5, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95),
+                 compression=100, hll_precision=12):
+        self.expected_types = expected_types or {}
+        self.top_k = top_k
+        self.quantiles = quantiles
+        self.compression = compression
+        self.hll_precision = hll_precision
+        self.rows = 0
+        self._columns = {}
+
+    def update(self, chunk, coerced=None):
+        """
+        Add a chunk. coerced optionally maps columns to (type,
+        coerce_column result) already computed for this chunk by the
+        validator; they are reused when the type matches the expected one.
+        """
+        self.rows += len(chunk)
+        coerced = coerced or {}
+        for col in chunk.columns:
+            state = self._columns.get(col)
+            if state is None:
+                state = _ColumnState(self.top_k, self.compression, self.hll_precision)
+                self._columns[col] = state
+            dtype = self.expected_types.get(col, "")
+            shared_type, shared = coerced.get(col, (None, None))
+            self._update_column(state, chunk[col], dtype, shared if shared_type == dtype else None)
+
+    def _update_column(self, state, series, dtype, coerced=None):
+        state.count += len(series)
+        values = series.dropna()
+        state.null_count += len(series) - len(values)
+        if len(values) == 0:
+            return
+
+        hashes = _hash_series(values)
+        state.hll.add_hashes(hashes)
+        state.cms.add_hashes(hashes)
+
+        # Chunk-local heavy hitters become top-k candidates; the sketch
+        # ranks them with counts accumulated over the whole sheet
+        heavy = values.value_counts(sort=True).head(state.top_k * 4).index
+        heavy_hashes = _hash_series(pd.Series(heavy, dtype=values.dtype))
+        for value, h in zip(heavy, heavy_hashes):
+            state.candidates[value] = h
+        if len(state.candidates) > state.top_k * 4:
+            items = list(state.candidates.items())
+            estimates = state.cms.estimate(np.array([h for _, h in items], dtype=np.uint64))
+            keep = np.argsort(-estimates, kind="stable")[:state.top_k * 4]
+            state.candidates = dict(items[i] for i in keep)
+
+        # Coerce once for the declared type (same conversion the validator
+        # uses) and reuse the numeric view for quantiles and min/max
+        if coerced is None:
+            coerced = coerce_column(values, dtype)
+        numeric = coerced["numeric"]
+        if numeric is None and pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            numeric = values.astype(float)
+
+        if numeric is not None:
+            numbers = numeric.dropna().to_numpy(dtype=np.float64)
+            if len(numbers):
+                if state.digest is None:
+                    state.digest = TDigest(state.compression)
+                state.digest.update(numbers)
+                self._update_range(state, numbers.min(), numbers.max())
+        elif pd.api.types.is_datetime64_any_dtype(values):
+            self._update_range(state, values.min(), values.max())
+        else:
+            as_text = values.astype(str)
+            self._update_range(state, as_text.min(), as_text.max())
+
+        if coerced["nonconforming"] is not None:
+            state.nonconforming += int(coerced["nonconforming"].sum())
+            state.type_checked = True
+
+    @staticmethod
+    def _update_range(state, low, high):
+        state.min = low if state.min is None or low < state.min else state.min
+        state.max = high if state.max is None or high > state.max else state.max
+
+    def result(self):
+        profile = {"rows": self.rows, "columns": {}}
+        for col, state in self._columns.items():
+            present = state.count - state.null_count
+            candidates = list(state.candidates.items())
+            estimates = state.cms.estimate(np.array([h for _, h in candidates], dtype=np.uint64))
+            top = sorted(zip(candidates, estimates), key=lambda item: -int(item[1]))[:state.top_k]
+            column = {
+                "count": state.count,
+                "null_count": state.null_count,
+                "distinct_estimate": min(state.hll.estimate(), present),
+                "min": _to_builtin(state.min),
+                "max": _to_builtin(state.max),
+                "top_k": [{"value": _to_builtin(value), "count": int(count)}
+                          for (value, _), count in top],
+                "quantiles": None,
+                "type_conformance": None,
+            }
+            if state.digest is not None:
+                column["quantiles"] = {
+                    f"p{int(round(q * 100))}": state.digest.quantile(q) for q in self.quantiles
+                }
+            if state.type_checked and present:
+                column["type_conformance"] = 1 - state.nonconforming / present
+            profile["columns"][str(col)] = column
+        return profile
+
+
+def profile_dataframe(df, expected_types=None, chunk_size=250000, **kwargs):
+    """
+    Profile a whole DataFrame chunk-wise and return the profile dict
+    """
+    profiler = ColumnProfiler(expected_types=expected_types, **kwargs)
+    for start in range(0, len(df), chunk_size):
+        profiler.update(df.iloc[start:start + chunk_size])
+    if len(df) == 0:
+        profiler.update(df)
+    return profiler.result()
+
+
+def format_profile_for_prompt(profile, max_columns=40):
+    """
+    Compact, line-per-column rendering of a profile for LLM prompts
+    """
+    lines = [f"Rows: {profile['rows']}"]
+    columns = list(profile["columns"].items())
+    for col, stats in columns[:max_columns]:
+        parts = [f"nulls={stats['null_count']}", f"distinct~{stats['distinct_estimate']}"]
+        if stats["min"] is not None:
+            parts.append(f"range=[{stats['min']}, {stats['max']}]")
+        if stats["quantiles"]:
+            parts.append("median=%.4g" % stats["quantiles"].get("p50", float("nan")))
+        if stats["type_conformance"] is not None:
+            parts.append(f"type_ok={stats['type_conformance']:.1%}")
+        if stats["top_k"]:
+            top = ", ".join(f"{item['value']} ({item['count']})" for item in stats["top_k"][:3])
+            parts.append(f"top: {top}")
+        lines.append(f"- {col}: " + "; ".join(parts))
+    if len(columns) > max_columns:
+        lines.append(f"... and {len(columns) - max_columns} more columns")
+    return "\n".join(lines)
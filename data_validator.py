@@ -1,7 +1,244 @@
 import pandas as pd
 import numpy as np
+from srs_expressions import (TYPE_KINDS, ExpressionError, bind_column_kinds, expression_columns, expression_violations,
+                             parse_dates, parse_expression)
 
-def validate_data_against_srs(data_df, srs_df):
+BOOL_VALUES = {
+    "true": True, "t": True, "yes": True, "y": True, "1": True, "1.0": True,
+    "false": False, "f": False, "no": False, "n": False, "0": False, "0.0": False,
+}
+
+# How many offending row labels to report per failed rule
+SAMPLE_ROWS = 5
+
+
+def _to_numeric(series):
+    if pd.api.types.is_bool_dtype(series):
+        return pd.Series(np.nan, index=series.index)
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    return pd.to_numeric(series, errors="coerce")
+
+
+def coerce_column(series, dtype):
+    """
+    Coerce a column once for its declared SRS type with vectorized
+    conversions. Returns a dict with:
+      present        - mask of non-null values
+      values         - coerced values (float, datetime or boolean), or None
+                       for types without a conversion
+      nonconforming  - mask of present values that fail the type, or None
+      numeric        - float view used by the Min/Max checks
+    """
+    present = series.notnull()
+    values = None
+    nonconforming = None
+
+    if dtype == "int" or dtype == "integer":
+        values = _to_numeric(series)
+        nonconforming = present & ~(values.notnull() & (values == np.floor(values)))
+    elif dtype == "float":
+        values = _to_numeric(series)
+        nonconforming = present & values.isnull()
+    elif dtype == "date":
+        values = parse_dates(series)
+        nonconforming = present & values.isnull()
+    elif dtype == "bool" or dtype == "boolean":
+        if pd.api.types.is_bool_dtype(series):
+            values = series.astype("boolean")
+        else:
+            values = series.astype(str).str.strip().str.lower().map(BOOL_VALUES).astype("boolean")
+        nonconforming = present & values.isnull()
+
+    numeric = values if values is not None and dtype in ("int", "integer", "float") else None
+    return {"present": present, "values": values, "nonconforming": nonconforming, "numeric": numeric}
+
+
+TYPE_ERRORS = {
+    "int": "Expected integer values",
+    "integer": "Expected integer values",
+    "float": "Expected float values",
+    "date": "Invalid date format",
+    "bool": "Expected boolean values",
+    "boolean": "Expected boolean values",
+}
+
+
+def compile_srs_rules(srs_df):
+    """
+    Read the SRS rows once into a list of rule dicts, parsing any
+    Expression column (see srs_expressions). Comparisons between two
+    columns are bound to the columns' declared Types. Every validation
+    entry point accepts either an SRS DataFrame or this compiled list.
+    """
+    if not isinstance(srs_df, pd.DataFrame):
+        return srs_df
+    rows = []
+    for _, rule in srs_df.iterrows():
+        col = rule.get("Column Name") or rule.get("column")
+        rows.append((None if pd.isnull(col) else col, rule))
+    column_kinds = {}
+    for col, rule in rows:
+        kind = TYPE_KINDS.get(str(rule.get("Type", "")).strip().lower())
+        if col is not None and kind:
+            column_kinds[col] = kind
+
+    rules = []
+    for col, rule in rows:
+        expression_text = rule.get("Expression")
+        expression_text = str(expression_text).strip() if pd.notnull(expression_text) else ""
+        expression = None
+        expression_error = None
+        if expression_text:
+            try:
+                expression = bind_column_kinds(parse_expression(expression_text), column_kinds)
+            except ExpressionError as e:
+                expression_error = str(e)
+
+        if col is None and not expression_text:
+            continue
+
+        if col is not None:
+            label = col
+        elif expression is not None:
+            label = ", ".join(sorted(expression_columns(expression)))
+        else:
+            label = "Expression"
+
+        rules.append({
+            "column": col,
+            "label": label,
+            "type": str(rule.get("Type", "")).lower(),
+            "required": str(rule.get("Required", "")).strip().lower() == "yes",
+            "min": rule.get("Min"),
+            "max": rule.get("Max"),
+            "regex": rule.get("Regex"),
+            "expression_text": expression_text,
+            "expression": expression,
+            "expression_error": expression_error,
+        })
+    return rules
+
+
+def rule_checks(rule):
+    """
+    Ordered (error message, check kind, parameter) checks of a compiled
+    rule. Check kinds are "required", "type", "min", "max" (parameter is
+    the threshold) and "expression" (parameter is the parsed tree); every
+    backend reports failures in this order with these messages.
+    """
+    checks = []
+    if rule["column"] is not None:
+        if rule["required"]:
+            checks.append(("Missing required values", "required", None))
+        if rule["type"] in TYPE_ERRORS:
+            checks.append((TYPE_ERRORS[rule["type"]], "type", None))
+        for kind, label in (("min", "below min"), ("max", "above max")):
+            value = rule[kind]
+            if pd.notnull(value):
+                try:
+                    threshold = float(value)
+                except (TypeError, ValueError):
+                    continue
+                checks.append((f"Value {label}: {value}", kind, threshold))
+    if rule["expression"] is not None:
+        checks.append((f"Expression failed: {rule['expression_text']}", "expression", rule["expression"]))
+    return checks
+
+
+def plan_rule(rule, columns):
+    """
+    Split a compiled rule into rule-level failures (error messages without
+    row counts) and the value-level checks that can run on a frame with
+    the given columns
+    """
+    failures = []
+    checks = []
+    column_present = rule["column"] is not None and rule["column"] in columns
+    if rule["column"] is not None and not column_present:
+        failures.append("Missing column")
+    if rule["expression_error"]:
+        failures.append(f"Invalid expression: {rule['expression_error']}")
+
+    for check in rule_checks(rule):
+        if check[1] == "expression":
+            missing = [c for c in sorted(expression_columns(check[2])) if c not in columns]
+            if missing:
+                failures.append(f"Expression references missing column: {', '.join(missing)}")
+                continue
+        elif not column_present:
+            continue
+        checks.append(check)
+    return failures, checks
+
+
+def _rule_violations(frame, rule, checks, numeric_cache, coerced_cache=None):
+    """
+    Per-value violation masks for the checks of one compiled rule, keyed by
+    the error message used in failed_rules. Each column is coerced once per
+    frame: numeric_cache holds the float views shared by the Min/Max checks
+    and by every expression that references the column. When given,
+    coerced_cache collects {column: (type, coerce_column result)} for reuse
+    by a ColumnProfiler.
+    """
+    def numeric(column):
+        if column not in numeric_cache:
+            numeric_cache[column] = _to_numeric(frame[column])
+        return numeric_cache[column]
+
+    masks = {}
+    coerced = None
+    for error, kind, param in checks:
+        if kind == "expression":
+            masks[error] = expression_violations(param, frame, numeric)
+            continue
+
+        if coerced is None:
+            coerced = coerce_column(frame[rule["column"]], rule["type"])
+            if coerced["numeric"] is not None:
+                numeric_cache[rule["column"]] = coerced["numeric"]
+            if coerced_cache is not None:
+                coerced_cache[rule["column"]] = (rule["type"], coerced)
+        if kind == "required":
+            masks[error] = ~coerced["present"]
+        elif kind == "type":
+            masks[error] = coerced["nonconforming"]
+        elif kind == "min":
+            masks[error] = (numeric(rule["column"]) < param).fillna(False)
+        else:
+            masks[error] = (numeric(rule["column"]) > param).fillna(False)
+
+    return masks
+
+
+def iter_check_violations(frame, rules):
+    """
+    Yield (rule, error, cells, mask) for every value-level check of the
+    compiled rules on one frame (or chunk); cells lists the columns whose
+    values the check reads, e.g. for highlighting in exported reports
+    """
+    numeric_cache = {}
+    for rule in rules:
+        _, checks = plan_rule(rule, frame.columns)
+        kinds = {error: (kind, param) for error, kind, param in checks}
+        for error, mask in _rule_violations(frame, rule, checks, numeric_cache).items():
+            kind, param = kinds[error]
+            if kind == "expression":
+                cells = [c for c in frame.columns if c in expression_columns(param)]
+            else:
+                cells = [rule["column"]]
+            yield rule, error, cells, mask
+
+
+def validate_data_against_srs(data_df, srs_df, profiler=None):
+    """
+    Validate data_df against the SRS rules. Returns (result_summary,
+    failed_rules).
+
+    Pass a column_profiler.ColumnProfiler as `profiler` to profile the
+    sheet in the same pass: it receives the frame together with the
+    columns already coerced for their SRS types.
+    """
     failed_rules = []
     result_summary = {
         "total_rows": len(data_df),
@@ -10,63 +247,171 @@ def validate_data_against_srs(data_df, srs_df):
         "errors": 0
     }
 
-    for _, rule in srs_df.iterrows():
-        col = rule.get("Column Name") or rule.get("column")
-        dtype = str(rule.get("Type", "")).lower()
-        required = str(rule.get("Required", "")).strip().lower() == "yes"
-        min_val = rule.get("Min")
-        max_val = rule.get("Max")
-        regex = rule.get("Regex")
-
-        if col not in data_df.columns:
-            failed_rules.append({"column": col, "error": "Missing column"})
-            result_summary["validation_passed"] = False
-            result_summary["errors"] += 1
-            continue
+    # Coerced numeric columns, shared by column checks and expressions
+    numeric_cache = {}
+    coerced_cache = {} if profiler is not None else None
 
-        series = data_df[col]
+    for rule in compile_srs_rules(srs_df):
+        failures, checks = plan_rule(rule, data_df.columns)
 
-        if required and series.isnull().any():
-            failed_rules.append({"column": col, "error": "Missing required values"})
+        for error in failures:
+            failed_rules.append({"column": rule["label"], "error": error})
             result_summary["validation_passed"] = False
             result_summary["errors"] += 1
 
-        if dtype == "int" or dtype == "integer":
-            if not pd.api.types.is_integer_dtype(series.dropna()):
-                failed_rules.append({"column": col, "error": "Expected integer values"})
+        # Value-level checks: each failure reports how many values violate
+        # the rule and where the first ones are
+        for error, mask in _rule_violations(data_df, rule, checks, numeric_cache, coerced_cache).items():
+            violations = int(mask.sum())
+            if violations:
+                failed_rules.append({
+                    "column": rule["label"],
+                    "error": error,
+                    "violations": violations,
+                    "sample_rows": data_df.index[mask.to_numpy(dtype=bool)][:SAMPLE_ROWS].tolist(),
+                })
                 result_summary["validation_passed"] = False
                 result_summary["errors"] += 1
 
-        elif dtype == "float":
-            if not pd.api.types.is_float_dtype(series.dropna()) and not pd.api.types.is_integer_dtype(series.dropna()):
-                failed_rules.append({"column": col, "error": "Expected float values"})
-                result_summary["validation_passed"] = False
-                result_summary["errors"] += 1
+    if profiler is not None:
+        profiler.update(data_df, coerced=coerced_cache)
 
-        elif dtype == "date":
-            try:
-                pd.to_datetime(series.dropna())
-            except Exception:
-                failed_rules.append({"column": col, "error": "Invalid date format"})
-                result_summary["validation_passed"] = False
-                result_summary["errors"] += 1
+    return result_summary, failed_rules
 
-        if pd.notnull(min_val):
-            try:
-                if (series.dropna().astype(float) < float(min_val)).any():
-                    failed_rules.append({"column": col, "error": f"Value below min: {min_val}"})
-                    result_summary["validation_passed"] = False
-                    result_summary["errors"] += 1
-            except:
-                pass
-
-        if pd.notnull(max_val):
-            try:
-                if (series.dropna().astype(float) > float(max_val)).any():
-                    failed_rules.append({"column": col, "error": f"Value above max: {max_val}"})
-                    result_summary["validation_passed"] = False
-                    result_summary["errors"] += 1
-            except:
-                pass
-
-    return result_summary, failed_rules
\ No newline at end of file
+
+def _wilson_interval(violations, n, z=1.96):
+    """
+    Wilson score interval for a violation rate observed on n rows
+    """
+    if n == 0:
+        return 0.0, 1.0
+    p = violations / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def _stratified_sample(n_rows, sample_size, strata, rng):
+    """
+    Positional sample of at most sample_size rows, spread evenly over
+    `strata` contiguous blocks of the frame so the head, middle and tail of
+    a file are all represented
+    """
+    if sample_size >= n_rows:
+        return np.arange(n_rows)
+    strata = max(1, min(strata, sample_size))
+    bounds = np.linspace(0, n_rows, strata + 1).astype(int)
+    # sample_size split over the strata; the first ones take the remainder
+    sizes = np.full(strata, sample_size // strata)
+    sizes[:sample_size % strata] += 1
+    picks = [
+        rng.choice(np.arange(start, stop), size=min(size, stop - start), replace=False)
+        for start, stop, size in zip(bounds[:-1], bounds[1:], sizes)
+        if stop > start
+    ]
+    return np.sort(np.concatenate(picks))
+
+
+def validate_data_against_srs_progressive(data_df, srs_df, sample_size=10000, strata=20,
+                                          chunk_size=250000, error_budget=None,
+                                          confidence_z=1.96, random_state=None, profiler=None):
+    """
+    Progressive validation for triage of very large sheets.
+
+    Validates a stratified sample first, then keeps scanning the remaining
+    rows chunk by chunk. Yields (result_summary, failed_rules) after the
+    sample and after every chunk. failed_rules entries carry the exact
+    violation count and rate over the rows scanned so far, and Wilson
+    confidence bounds on the sheet-wide rate estimated from the stratified
+    sample only (the sequentially scanned chunks are not a random sample);
+    once every row is scanned the bounds collapse to the exact rate.
+    The last yielded result has result_summary["provisional"] == False
+    once every row was scanned. If error_budget (a number of violating
+    values) is exceeded, the scan stops early and the last result stays
+    provisional with result_summary["stopped_early"] == True.
+
+    Pass a column_profiler.ColumnProfiler as `profiler` to build the column
+    profile from the same chunks instead of re-reading the sheet.
+    """
+    n_rows = len(data_df)
+    rng = np.random.default_rng(random_state)
+
+    rules = []
+    rule_failures = []
+    for rule in compile_srs_rules(srs_df):
+        failures, checks = plan_rule(rule, data_df.columns)
+        rule_failures.extend({"column": rule["label"], "error": error} for error in failures)
+        rules.append((rule, checks))
+
+    # (label, error) -> violating rows seen so far, in SRS order
+    counts = {}
+    for rule, checks in rules:
+        for error, _, _ in checks:
+            counts[(rule["label"], error)] = 0
+    sample_counts = {}
+
+    def scan(frame):
+        if profiler is not None:
+            profiler.update(frame)
+        numeric_cache = {}
+        for rule, checks in rules:
+            for error, mask in _rule_violations(frame, rule, checks, numeric_cache).items():
+                counts[(rule["label"], error)] += int(mask.sum())
+
+    def snapshot(rows_scanned, provisional, stopped_early):
+        failed_rules = list(rule_failures)
+        for key, violations in counts.items():
+            if violations == 0:
+                continue
+            col, error = key
+            if rows_scanned == n_rows:
+                low = high = violations / n_rows
+            else:
+                low, high = _wilson_interval(sample_counts[key], sample_rows, confidence_z)
+            failed_rules.append({
+                "column": col,
+                "error": error,
+                "violations": violations,
+                "violation_rate": violations / rows_scanned,
+                "sample_violations": sample_counts[key],
+                "rate_ci_low": low,
+                "rate_ci_high": high,
+            })
+        result_summary = {
+            "total_rows": n_rows,
+            "total_columns": len(data_df.columns),
+            "validation_passed": not failed_rules,
+            "errors": len(failed_rules),
+            "rows_scanned": rows_scanned,
+            "provisional": provisional,
+            "stopped_early": stopped_early,
+        }
+        return result_summary, failed_rules
+
+    def over_budget():
+        return error_budget is not None and sum(counts.values()) > error_budget
+
+    sample_positions = _stratified_sample(n_rows, sample_size, strata, rng)
+    scan(data_df.iloc[sample_positions])
+    rows_scanned = sample_rows = len(sample_positions)
+    sample_counts.update(counts)
+
+    if rows_scanned == n_rows or over_budget():
+        yield snapshot(rows_scanned, rows_scanned < n_rows, rows_scanned < n_rows)
+        return
+    yield snapshot(rows_scanned, True, False)
+
+    remaining = np.ones(n_rows, dtype=bool)
+    remaining[sample_positions] = False
+    for start in range(0, n_rows, chunk_size):
+        positions = np.flatnonzero(remaining[start:start + chunk_size]) + start
+        if len(positions) == 0:
+            continue
+        scan(data_df.iloc[positions])
+        rows_scanned += len(positions)
+        done = rows_scanned == n_rows
+        if over_budget() and not done:
+            yield snapshot(rows_scanned, True, True)
+            return
+        yield snapshot(rows_scanned, not done, False)
@@ -6,7 +6,9 @@ Excel File Debugging Utility for PFRDA AI Validator
 import pandas as pd
 import sys
 import os
+import time
 from pathlib import Path
+from xlsx_inspector import inspect_xlsx
 
 def debug_excel_file(file_path):
     """
@@ -24,6 +26,39 @@ def debug_excel_file(file_path):
         file_size = os.path.getsize(file_path)
         print(f"📁 File size: {file_size:,} bytes")
         
+        # Method 0: read sheet names, dimensions and headers from the workbook XML
+        if file_path.endswith('.xlsx'):
+            print("\n⚡ Inspecting workbook XML...")
+            try:
+                started = time.perf_counter()
+                sheets = inspect_xlsx(file_path)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                print(f"✅ Inspected in {elapsed_ms:.1f} ms")
+                print(f"📋 Found {len(sheets)} sheets: {[s['name'] for s in sheets]}")
+                for sheet in sheets:
+                    state = f" [{sheet['state']}]" if sheet['state'] != 'visible' else ""
+                    print(f"  📄 Sheet '{sheet['name']}'{state}: {sheet['rows']} rows × {sheet['columns']} columns"
+                          f" (dimension {sheet['dimension'] or 'not declared'})")
+                    if sheet['headers']:
+                        print(f"     Columns: {sheet['headers']}")
+                
+                # Only the first rows of the first non-empty sheets are loaded for a sample
+                sampled = [s for s in sheets if s['columns']][:3]
+                xls = pd.ExcelFile(file_path, engine='openpyxl') if sampled else None
+                for sheet in sampled:
+                    try:
+                        df = xls.parse(sheet['name'], nrows=2)
+                        if len(df) > 0:
+                            print(f"     Sample data ('{sheet['name']}'):")
+                            print(df.to_string(index=False))
+                    except Exception as sheet_error:
+                        print(f"  ❌ Sheet '{sheet['name']}' error: {str(sheet_error)}")
+                
+                print(f"\n✅ File debugging completed successfully!")
+                return True
+            except ValueError as inspect_error:
+                print(f"❌ Workbook inspection failed: {str(inspect_error)}")
+        
         # Try reading with pandas
         print("\n🔄 Attempting to read Excel file...")
         
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Fake Ollama HTTP server for deterministic testing and load testing.
+
+Implements the parts of the Ollama API that ollama_agent uses
+(POST /api/generate, streaming or not) plus GET /api/tags, with
+configurable latency, token rate and failure injection. Responses and
+injected failures are reproducible for a given seed.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOllamaServer:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.05, latency_jitter=0.0,
+                 tokens_per_second=200.0, response_tokens=50, failure_rate=0.0, seed=0):
+        """
+        latency: seconds before the first token; latency_jitter: +/- uniform
+        jitter on that; tokens_per_second: generation speed (0 = instant);
+        response_tokens: tokens per answer; failure_rate: share of requests
+        answered with HTTP 500
+        """
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests_served = 0
+        self.failures_injected = 0
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def url(self):
+        return f"{self.base_url}/api/generate"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _plan_request(self):
+        """
+        Draw latency and failure for one request from the seeded generator
+        """
+        with self._lock:
+            self.requests_served += 1
+            delay = self.latency
+            if self.latency_jitter:
+                delay += self._rng.uniform(-self.latency_jitter, self.latency_jitter)
+            fail = self._rng.random() < self.failure_rate
+            if fail:
+                self.failures_injected += 1
+        return max(0.0, delay), fail
+
+    def _tokens(self, prompt):
+        words = prompt.split() or ["ok"]
+        return [f"{words[i % len(words)]} " for i in range(self.response_tokens)]
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send_json(200, {"models": [{"name": "fake"}]})
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                if self.path != "/api/generate":
+                    self._send_json(404, {"error": "not found"})
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._send_json(400, {"error": "invalid JSON"})
+                    return
+
+                delay, fail = server._plan_request()
+                time.sleep(delay)
+                if fail:
+                    self._send_json(500, {"error": "injected failure"})
+                    return
+
+                model = request.get("model", "fake")
+                tokens = server._tokens(str(request.get("prompt", "")))
+                per_token = 1.0 / server.tokens_per_second if server.tokens_per_second else 0.0
+
+                if request.get("stream", True):
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Connection", "close")
+                    self.end_headers()
+                    for token in tokens:
+                        time.sleep(per_token)
+                        line = {"model": model, "response": token, "done": False}
+                        self.wfile.write(json.dumps(line).encode("utf-8") + b"\n")
+                        self.wfile.flush()
+                    done = {"model": model, "response": "", "done": True, "eval_count": len(tokens)}
+                    self.wfile.write(json.dumps(done).encode("utf-8") + b"\n")
+                    self.close_connection = True
+                else:
+                    time.sleep(per_token * len(tokens))
+                    self._send_json(200, {
+                        "model": model,
+                        "response": "".join(tokens).strip(),
+                        "done": True,
+                        "eval_count": len(tokens),
+                    })
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Ollama server for tests and load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds before the first token")
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--response-tokens", type=int, default=50)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeOllamaServer(
+        host=args.host, port=args.port, latency=args.latency, latency_jitter=args.latency_jitter,
+        tokens_per_second=args.tokens_per_second, response_tokens=args.response_tokens,
+        failure_rate=args.failure_rate, seed=args.seed,
+    )
+    print(f"🤖 Fake Ollama listening on {server.base_url} (set OLLAMA_URL={server.url})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,9 @@ from datetime import datetime
 import io
 import pandas as pd
 
+# Rollup month of a validation run, as "YYYY-MM"
+ROLLUP_MONTH = {"$dateToString": {"format": "%Y-%m", "date": "$validation_date"}}
+
 class MongoDBService:
     def __init__(self, connection_string="mongodb://localhost:27017/", database_name="pfrda_ai_validator"):
         """
@@ -34,14 +37,41 @@ class MongoDBService:
             self.validations_collection = self.db.validation_results
             self.ai_responses_collection = self.db.ai_responses
             
+            # Pre-aggregated monthly rollups, updated incrementally on insert
+            self.sheet_rollups_collection = self.db.validation_sheet_rollups
+            self.column_rollups_collection = self.db.validation_column_rollups
+            
             # Test connection
             self.client.admin.command('ping')
             print(f"✅ Connected to MongoDB database: {database_name}")
             
+            self._ensure_indexes()
+            
         except Exception as e:
             print(f"❌ Failed to connect to MongoDB: {e}")
             self.client = None
     
+    def _ensure_indexes(self):
+        """
+        Create the indexes backing history queries and rollup upserts
+        """
+        try:
+            self.validations_collection.create_index([("validation_date", pymongo.DESCENDING)])
+            self.validations_collection.create_index([("file_id", pymongo.ASCENDING), ("validation_date", pymongo.DESCENDING)])
+            self.validations_collection.create_index([("sheet_name", pymongo.ASCENDING), ("validation_date", pymongo.DESCENDING)])
+            self.ai_responses_collection.create_index([("file_id", pymongo.ASCENDING), ("generated_date", pymongo.DESCENDING)])
+            self._ensure_rollup_indexes(self.sheet_rollups_collection, self.column_rollups_collection)
+        except Exception as e:
+            print(f"⚠️ Could not create MongoDB indexes: {e}")
+    
+    @staticmethod
+    def _ensure_rollup_indexes(sheet_rollups, column_rollups):
+        sheet_rollups.create_index(
+            [("month", pymongo.ASCENDING), ("sheet_name", pymongo.ASCENDING)], unique=True)
+        column_rollups.create_index(
+            [("month", pymongo.ASCENDING), ("sheet_name", pymongo.ASCENDING), ("column", pymongo.ASCENDING)], unique=True)
+        column_rollups.create_index([("sheet_name", pymongo.ASCENDING), ("month", pymongo.ASCENDING)])
+    
     def store_uploaded_file(self, file_content, filename, file_type, sheet_data=None):
         """
         Store uploaded file in GridFS and metadata in collection
@@ -83,9 +113,9 @@ class MongoDBService:
             print(f"❌ Error storing file: {e}")
             return None
     
-    def store_validation_results(self, file_id, sheet_name, validation_summary, failed_rules):
+    def store_validation_results(self, file_id, sheet_name, validation_summary, failed_rules, column_profile=None):
         """
-        Store validation results
+        Store validation results, optionally with the sheet's column profile
         """
         if not self.client:
             return None
@@ -100,8 +130,14 @@ class MongoDBService:
                 "total_failures": len(failed_rules) if failed_rules else 0,
                 "status": "failed" if failed_rules else "passed"
             }
+            if column_profile:
+                validation_doc["column_profile"] = column_profile
             
             result = self.validations_collection.insert_one(validation_doc)
+            try:
+                self._update_validation_rollups(validation_doc)
+            except Exception as rollup_error:
+                print(f"⚠️ Could not update validation rollups: {rollup_error}")
             print(f"✅ Stored validation results for sheet: {sheet_name}")
             return str(result.inserted_id)
             
@@ -109,6 +145,214 @@ class MongoDBService:
             print(f"❌ Error storing validation results: {e}")
             return None
     
+    @staticmethod
+    def _rollup_column(column):
+        """
+        Column key of the column rollups; matches $toString in the rebuild
+        pipeline, which keeps a null column null
+        """
+        return None if column is None else str(column)
+    
+    @staticmethod
+    def _rollup_updates(validation_doc):
+        """
+        (month, sheet_name, failed, failures per column) of one validation run
+        """
+        month = validation_doc["validation_date"].strftime("%Y-%m")
+        failed_rules = validation_doc["failed_rules"] or []
+        failures_by_column = {}
+        for rule in failed_rules:
+            column = MongoDBService._rollup_column(rule.get("column"))
+            failures_by_column[column] = failures_by_column.get(column, 0) + 1
+        return month, validation_doc["sheet_name"], bool(failed_rules), failures_by_column
+    
+    def _update_validation_rollups(self, validation_doc):
+        """
+        Fold one validation run into the monthly sheet and column rollups
+        """
+        month, sheet_name, failed, failures_by_column = self._rollup_updates(validation_doc)
+        
+        self.sheet_rollups_collection.update_one(
+            {"month": month, "sheet_name": sheet_name},
+            {"$inc": {"runs": 1, "failed_runs": 1 if failed else 0}},
+            upsert=True
+        )
+        
+        if failures_by_column:
+            self.column_rollups_collection.bulk_write([
+                pymongo.UpdateOne(
+                    {"month": month, "sheet_name": sheet_name, "column": column},
+                    {"$inc": {"failed_runs": 1, "failures": failures}},
+                    upsert=True
+                )
+                for column, failures in failures_by_column.items()
+            ], ordered=False)
+    
+    @staticmethod
+    def _sheet_rollup_pipeline(out):
+        return [
+            {"$group": {
+                "_id": {"month": ROLLUP_MONTH, "sheet_name": "$sheet_name"},
+                "runs": {"$sum": 1},
+                "failed_runs": {"$sum": {"$cond": [{"$eq": ["$status", "failed"]}, 1, 0]}}
+            }},
+            {"$project": {"_id": 0, "month": "$_id.month", "sheet_name": "$_id.sheet_name",
+                          "runs": 1, "failed_runs": 1}},
+            {"$out": out}
+        ]
+    
+    @staticmethod
+    def _column_rollup_pipeline(out):
+        return [
+            {"$match": {"status": "failed"}},
+            {"$unwind": "$failed_rules"},
+            {"$group": {
+                "_id": {"run": "$_id", "month": ROLLUP_MONTH, "sheet_name": "$sheet_name",
+                        "column": {"$toString": "$failed_rules.column"}},
+                "failures": {"$sum": 1}
+            }},
+            {"$group": {
+                "_id": {"month": "$_id.month", "sheet_name": "$_id.sheet_name", "column": "$_id.column"},
+                "failed_runs": {"$sum": 1},
+                "failures": {"$sum": "$failures"}
+            }},
+            {"$project": {"_id": 0, "month": "$_id.month", "sheet_name": "$_id.sheet_name",
+                          "column": "$_id.column", "failed_runs": 1, "failures": 1}},
+            {"$out": out}
+        ]
+    
+    def rebuild_validation_rollups(self):
+        """
+        Recompute both rollup collections from validation_results with
+        server-side aggregation (backfill after imports or schema changes).
+        Each rollup is built into a staging collection that then replaces
+        it by rename, so readers never see a partial rollup and no rollup
+        document is deleted or replaced while incremental updates write to
+        it. A run stored while the rebuild is in progress may be missing
+        until the next rebuild.
+        """
+        if not self.client:
+            return False
+            
+        try:
+            targets = [
+                (self.sheet_rollups_collection, self._sheet_rollup_pipeline),
+                (self.column_rollups_collection, self._column_rollup_pipeline),
+            ]
+            staging = [self.db[f"{target.name}_staging"] for target, _ in targets]
+            for collection in staging:
+                collection.drop()
+            # $out keeps the staging indexes, and rename carries them over
+            self._ensure_rollup_indexes(*staging)
+            
+            for (target, pipeline), collection in zip(targets, staging):
+                self.validations_collection.aggregate(pipeline(collection.name))
+            for (target, _), collection in zip(targets, staging):
+                collection.rename(target.name, dropTarget=True)
+            print("✅ Rebuilt validation rollups")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error rebuilding validation rollups: {e}")
+            return False
+    
+    @staticmethod
+    def _month_match(sheet_name=None, start_month=None, end_month=None):
+        match = {}
+        if sheet_name:
+            match["sheet_name"] = sheet_name
+        if start_month or end_month:
+            match["month"] = {}
+            if start_month:
+                match["month"]["$gte"] = start_month
+            if end_month:
+                match["month"]["$lte"] = end_month
+        return match
+    
+    def get_column_failure_rates(self, sheet_name=None, start_month=None, end_month=None):
+        """
+        Failure rate per column per month ("YYYY-MM" bounds, inclusive):
+        runs where the column failed / validation runs of its sheet
+        """
+        if not self.client:
+            return []
+            
+        try:
+            pipeline = [
+                {"$match": self._month_match(sheet_name, start_month, end_month)},
+                {"$lookup": {
+                    "from": self.sheet_rollups_collection.name,
+                    "let": {"month": "$month", "sheet_name": "$sheet_name"},
+                    "pipeline": [
+                        {"$match": {"$expr": {"$and": [
+                            {"$eq": ["$month", "$$month"]},
+                            {"$eq": ["$sheet_name", "$$sheet_name"]}
+                        ]}}},
+                        {"$project": {"_id": 0, "runs": 1}}
+                    ],
+                    "as": "sheet"
+                }},
+                {"$unwind": "$sheet"},
+                {"$project": {
+                    "_id": 0, "month": 1, "sheet_name": 1, "column": 1,
+                    "failed_runs": 1, "failures": 1, "runs": "$sheet.runs",
+                    "failure_rate": {"$cond": [{"$gt": ["$sheet.runs", 0]},
+                                               {"$divide": ["$failed_runs", "$sheet.runs"]}, 0]}
+                }},
+                {"$sort": {"month": 1, "sheet_name": 1, "failure_rate": -1}}
+            ]
+            return list(self.column_rollups_collection.aggregate(pipeline))
+        except Exception as e:
+            print(f"❌ Error getting column failure rates: {e}")
+            return []
+    
+    def get_validation_trends(self, sheet_name=None, start_month=None, end_month=None):
+        """
+        Monthly validation runs, failed runs and failure rate
+        """
+        if not self.client:
+            return []
+            
+        try:
+            pipeline = [
+                {"$match": self._month_match(sheet_name, start_month, end_month)},
+                {"$group": {"_id": "$month", "runs": {"$sum": "$runs"}, "failed_runs": {"$sum": "$failed_runs"}}},
+                {"$project": {
+                    "_id": 0, "month": "$_id", "runs": 1, "failed_runs": 1,
+                    "failure_rate": {"$cond": [{"$gt": ["$runs", 0]}, {"$divide": ["$failed_runs", "$runs"]}, 0]}
+                }},
+                {"$sort": {"month": 1}}
+            ]
+            return list(self.sheet_rollups_collection.aggregate(pipeline))
+        except Exception as e:
+            print(f"❌ Error getting validation trends: {e}")
+            return []
+    
+    def get_top_failing_columns(self, limit=10, sheet_name=None, start_month=None, end_month=None):
+        """
+        Columns with the most failed runs over the selected months
+        """
+        if not self.client:
+            return []
+            
+        try:
+            pipeline = [
+                {"$match": self._month_match(sheet_name, start_month, end_month)},
+                {"$group": {
+                    "_id": {"sheet_name": "$sheet_name", "column": "$column"},
+                    "failed_runs": {"$sum": "$failed_runs"},
+                    "failures": {"$sum": "$failures"}
+                }},
+                {"$sort": {"failed_runs": -1}},
+                {"$limit": limit},
+                {"$project": {"_id": 0, "sheet_name": "$_id.sheet_name", "column": "$_id.column",
+                              "failed_runs": 1, "failures": 1}}
+            ]
+            return list(self.column_rollups_collection.aggregate(pipeline))
+        except Exception as e:
+            print(f"❌ Error getting top failing columns: {e}")
+            return []
+    
     def store_ai_response(self, file_id, sheet_name, response_type, prompt, ai_response, model_used="mistral"):
         """
         Store AI-generated responses
@@ -1,26 +1,50 @@
+import os
 import requests
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from mongodb_service import MongoDBService
+from column_profiler import format_profile_for_prompt
+from prompt_builder import (DEFAULT_MAX_MAP_PROMPTS, DEFAULT_MAX_PROMPT_TOKENS, build_failure_prompts,
+                            build_reduce_prompts)
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
-MODEL = "mistral"  # or "llama2" depending on what you pulled via ollama
+# Override with the OLLAMA_URL / OLLAMA_MODEL environment variables, e.g. to
+# point at fake_ollama.py for load tests
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434/api/generate")
+MODEL = os.environ.get("OLLAMA_MODEL", "mistral")  # or "llama2" depending on what you pulled via ollama
+OLLAMA_TIMEOUT = float(os.environ.get("OLLAMA_TIMEOUT", "300"))
 
 # Initialize MongoDB service
 mongo_service = MongoDBService()
 
-def explain_validation_results(sheet_name, failed_rules, file_id=None):
-    failures = "\n".join([f"- {r['column']}: {r['error']}" for r in failed_rules])
-    prompt = f"""
-You are a data validation assistant. Explain why the following fields failed validation in sheet '{sheet_name}' and what the user can do to fix them:
-
-{failures}
+def _generate(prompt, default="No explanation returned."):
+    response = requests.post(OLLAMA_URL, json={"model": MODEL, "prompt": prompt, "stream": False},
+                             timeout=OLLAMA_TIMEOUT)
+    response.raise_for_status()
+    return response.json().get("response", default)
 
-Respond clearly and helpfully.
-"""
+def explain_validation_results(sheet_name, failed_rules, file_id=None,
+                               max_prompt_tokens=DEFAULT_MAX_PROMPT_TOKENS, max_workers=4,
+                               max_map_prompts=DEFAULT_MAX_MAP_PROMPTS, raise_errors=False):
+    # Grouped, ranked and budgeted; large reports become (at most
+    # max_map_prompts) map prompts explained in parallel and combined by
+    # reduce prompts, in stages until a single one fits the budget.
+    # Failures return an error message, or raise with raise_errors=True
+    # (e.g. so that callers caching the result never cache an error)
+    prompts = build_failure_prompts(sheet_name, failed_rules, max_prompt_tokens, max_map_prompts)
     
     try:
-        response = requests.post(OLLAMA_URL, json={"model": MODEL, "prompt": prompt, "stream": False})
-        ai_response = response.json().get("response", "No explanation returned.")
+        if len(prompts) == 1:
+            prompt = prompts[0]
+            ai_response = _generate(prompt)
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(prompts))) as pool:
+                partial_explanations = list(pool.map(_generate, prompts))
+                reduce_prompts = build_reduce_prompts(sheet_name, partial_explanations, max_prompt_tokens)
+                while len(reduce_prompts) > 1:
+                    partial_explanations = list(pool.map(_generate, reduce_prompts))
+                    reduce_prompts = build_reduce_prompts(sheet_name, partial_explanations, max_prompt_tokens)
+            prompt = reduce_prompts[0]
+            ai_response = _generate(prompt)
         
         # Store AI response in MongoDB
         if file_id and mongo_service.client:
@@ -38,23 +62,30 @@ Respond clearly and helpfully.
     except Exception as e:
         error_msg = f"Error getting AI explanation: {e}"
         print(error_msg)
+        if raise_errors:
+            raise
         return error_msg
 
-def summarize_data_sheet(df: pd.DataFrame, sheet_name: str, file_id=None):
+def summarize_data_sheet(df: pd.DataFrame, sheet_name: str, file_id=None, profile=None, raise_errors=False):
     cols = df.columns.tolist()
     summary = f"This sheet '{sheet_name}' contains {len(df)} rows and {len(cols)} columns.\n\nColumns include: {', '.join(cols)}."
     sample_data = df.head(3).to_dict(orient="records")
 
+    # A precomputed column profile (see column_profiler) describes the whole
+    # sheet, not just the first rows
+    profile_text = ""
+    if profile:
+        profile_text = f"\nColumn statistics over all rows:\n{format_profile_for_prompt(profile)}\n"
+
     prompt = f"""
 Given the sheet '{sheet_name}' with sample data:
 {sample_data}
-
+{profile_text}
 Explain what this data appears to represent and briefly describe each column.
 """
     
     try:
-        response = requests.post(OLLAMA_URL, json={"model": MODEL, "prompt": prompt, "stream": False})
-        ai_response = response.json().get("response", "No summary returned.")
+        ai_response = _generate(prompt, default="No summary returned.")
         
         # Store AI response in MongoDB
         if file_id and mongo_service.client:
@@ -72,4 +103,6 @@ Explain what this data appears to represent and briefly describe each column.
     except Exception as e:
         error_msg = f"Error getting AI summary: {e}"
         print(error_msg)
+        if raise_errors:
+            raise
         return error_msg
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Load test for the AI paths of the validator.
+
+Runs explain_validation_results / summarize_data_sheet concurrently against
+a fake Ollama server (or a real one with --url) and reports end-to-end
+throughput and latency percentiles.
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from fake_ollama import FakeOllamaServer
+from sample_data import make_sheet
+
+
+def make_failed_rules(n_columns):
+    errors = ["Missing required values", "Expected float values", "Value below min: 0", "Invalid date format"]
+    return [
+        {"column": f"Column_{i}", "error": errors[i % len(errors)], "violations": (i * 37) % 1000 + 1}
+        for i in range(n_columns)
+    ]
+
+
+def run_load_test(target, requests_total, concurrency, url=None, failed_columns=40, sheet_rows=1000):
+    """
+    Call the target ("explain" or "summarize") requests_total times with the
+    given concurrency, against url if given. Returns a dict of
+    throughput/latency statistics.
+    """
+    import ollama_agent
+    if url:
+        ollama_agent.OLLAMA_URL = url
+
+    failed_rules = make_failed_rules(failed_columns)
+    sheet = make_sheet(sheet_rows)
+
+    def call(i):
+        start = time.perf_counter()
+        if target == "explain":
+            result = ollama_agent.explain_validation_results(f"Sheet_{i}", failed_rules)
+        else:
+            result = ollama_agent.summarize_data_sheet(sheet, f"Sheet_{i}")
+        ok = not str(result).startswith("Error getting AI")
+        return time.perf_counter() - start, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(call, range(requests_total)))
+    elapsed = time.perf_counter() - started
+
+    latencies = np.array([latency for latency, _ in outcomes])
+    errors = sum(1 for _, ok in outcomes if not ok)
+    return {
+        "target": target,
+        "requests": requests_total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "throughput_rps": requests_total / elapsed if elapsed else float("inf"),
+        "latency_p50_s": float(np.percentile(latencies, 50)),
+        "latency_p95_s": float(np.percentile(latencies, 95)),
+        "latency_max_s": float(latencies.max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test explain_validation_results / summarize_data_sheet")
+    parser.add_argument("--target", choices=["explain", "summarize", "both"], default="both")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--failed-columns", type=int, default=40)
+    parser.add_argument("--url", help="use this Ollama endpoint instead of the bundled fake server")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--tokens-per-second", type=float, default=500.0)
+    parser.add_argument("--response-tokens", type=int, default=50)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if not url:
+        server = FakeOllamaServer(latency=args.latency, tokens_per_second=args.tokens_per_second,
+                                  response_tokens=args.response_tokens, failure_rate=args.failure_rate,
+                                  seed=args.seed).start()
+        url = server.url
+    print(f"🎯 Ollama endpoint: {url}")
+
+    targets = ["explain", "summarize"] if args.target == "both" else [args.target]
+    try:
+        for target in targets:
+            stats = run_load_test(target, args.requests, args.concurrency, url, args.failed_columns)
+            print(f"\n📈 {target}: {stats['requests']} requests @ concurrency {stats['concurrency']}")
+            print(f"  Throughput: {stats['throughput_rps']:.1f} req/s ({stats['elapsed_s']:.2f}s total)")
+            print(f"  Latency p50/p95/max: {stats['latency_p50_s']:.3f}s / "
+                  f"{stats['latency_p95_s']:.3f}s / {stats['latency_max_s']:.3f}s")
+            print(f"  Errors: {stats['errors']}")
+    finally:
+        if server:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
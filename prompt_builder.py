@@ -0,0 +1,220 @@
+"""
+Token-budgeted prompt building for validation explanations.
+
+Failed rules are grouped by (column, error kind), deduplicated and ranked
+by severity and impact before they are rendered. Reports that do not fit
+into one prompt are split into at most DEFAULT_MAX_MAP_PROMPTS map prompts
+(the least severe groups beyond that are only counted), whose answers are
+combined by reduce prompts in stages until a single one fits the budget.
+"""
+
+DEFAULT_MAX_PROMPT_TOKENS = 1500
+DEFAULT_MAX_MAP_PROMPTS = 8
+
+# Smallest share of a reduce prompt a partial answer is trimmed to; sets
+# how many answers one reduce prompt combines
+MIN_REDUCE_PART_TOKENS = 150
+
+# Higher is more severe; matched against the error kind (text before ':')
+SEVERITY_BY_KIND = {
+    "Missing column": 5,
+    "Invalid expression": 5,
+    "Expression references missing column": 5,
+    "Missing required values": 4,
+    "Expected integer values": 3,
+    "Expected float values": 3,
+    "Invalid date format": 3,
+    "Expected boolean values": 3,
+    "Value below min": 2,
+    "Value above max": 2,
+    "Expression failed": 3,
+}
+DEFAULT_SEVERITY = 1
+
+MAP_TEMPLATE = """
+You are a data validation assistant. Explain why the following fields failed validation in sheet '{sheet_name}' and what the user can do to fix them:
+
+{failures}
+
+Respond clearly and helpfully.
+"""
+
+PART_TEMPLATE = """
+You are a data validation assistant. This is part {part} of {parts} of the validation failures in sheet '{sheet_name}'. Explain why these fields failed and what the user can do to fix them:
+
+{failures}
+
+Respond concisely; another step will combine all parts.
+"""
+
+REDUCE_TEMPLATE = """
+You are a data validation assistant. The validation failures of sheet '{sheet_name}' were explained in {parts} parts, most severe first:
+
+{explanations}
+
+Combine these into one clear, deduplicated explanation with prioritized fix-up steps for the user.
+"""
+
+PARTIAL_REDUCE_TEMPLATE = """
+You are a data validation assistant. These are {parts} partial explanations of the validation failures in sheet '{sheet_name}', most severe first:
+
+{explanations}
+
+Combine them into one concise, deduplicated explanation; another step will combine it with other parts.
+"""
+
+OMITTED_TEMPLATE = "- ... and {count} more lower-severity failure groups, not shown"
+
+
+def estimate_tokens(text):
+    """
+    Cheap token estimate (about four characters per token for English text)
+    """
+    return (len(text) + 3) // 4
+
+
+def _split_error(error):
+    kind, sep, detail = str(error).partition(":")
+    return kind.strip(), detail.strip() if sep else ""
+
+
+def group_failures(failed_rules):
+    """
+    Group failed rules by (column, error kind), deduplicating repeated
+    entries. Returns groups ranked by severity, then by impact.
+    """
+    groups = {}
+    for rule in failed_rules:
+        kind, detail = _split_error(rule.get("error", ""))
+        key = (str(rule.get("column")), kind)
+        group = groups.get(key)
+        if group is None:
+            group = {
+                "column": key[0],
+                "kind": kind,
+                "details": [],
+                "occurrences": 0,
+                "impact": 0,
+                "severity": SEVERITY_BY_KIND.get(kind, DEFAULT_SEVERITY),
+            }
+            groups[key] = group
+        group["occurrences"] += 1
+        # Value-level counts from the validator when present, else one per entry
+        group["impact"] += int(rule.get("violations") or 1)
+        if detail and detail not in group["details"]:
+            group["details"].append(detail)
+
+    return sorted(groups.values(), key=lambda g: (-g["severity"], -g["impact"], g["column"]))
+
+
+def render_group(group, max_details=3):
+    line = f"- {group['column']}: {group['kind']}"
+    details = group["details"]
+    if details:
+        shown = ", ".join(details[:max_details])
+        if len(details) > max_details:
+            shown += f", ... (+{len(details) - max_details} more)"
+        line += f" ({shown})"
+    if group["impact"] > group["occurrences"]:
+        line += f" - {group['impact']:,} affected values"
+    elif group["occurrences"] > 1:
+        line += f" - reported {group['occurrences']} times"
+    return line
+
+
+def _truncate_to_tokens(text, max_tokens):
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    return text[:max(0, max_tokens * 4 - 3)] + "..."
+
+
+def _batch_lines(lines, line_budget):
+    batches, batch, used = [], [], 0
+    for line in lines:
+        line = _truncate_to_tokens(line, line_budget)
+        cost = estimate_tokens(line) + 1
+        if batch and used + cost > line_budget:
+            batches.append(batch)
+            batch, used = [], 0
+        batch.append(line)
+        used += cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def build_failure_prompts(sheet_name, failed_rules, max_prompt_tokens=DEFAULT_MAX_PROMPT_TOKENS,
+                          max_prompts=DEFAULT_MAX_MAP_PROMPTS):
+    """
+    Build the prompts explaining failed_rules, each within max_prompt_tokens.
+
+    Returns a list with a single prompt when everything fits; otherwise one
+    prompt per part, to be explained independently and combined with
+    build_reduce_prompts. At most max_prompts parts are built (None for no
+    limit): the most severe groups are kept and the rest are counted in a
+    closing line of the last part.
+    """
+    lines = [render_group(g) for g in group_failures(failed_rules)]
+    single = MAP_TEMPLATE.format(sheet_name=sheet_name, failures="\n".join(lines))
+    if estimate_tokens(single) <= max_prompt_tokens:
+        return [single]
+
+    # Reserve room for the template; the part counters are at most a few digits
+    overhead = estimate_tokens(PART_TEMPLATE.format(part=999, parts=999, sheet_name=sheet_name, failures=""))
+    line_budget = max(1, max_prompt_tokens - overhead)
+
+    batches = _batch_lines(lines, line_budget)
+    if max_prompts is not None and len(batches) > max_prompts:
+        # Re-batch with room for the omission line, then keep the first parts
+        omitted_cost = estimate_tokens(OMITTED_TEMPLATE.format(count=len(lines))) + 1
+        batches = _batch_lines(lines, max(1, line_budget - omitted_cost))
+        kept = batches[:max_prompts]
+        omitted = len(lines) - sum(len(batch) for batch in kept)
+        if omitted:
+            kept[-1].append(OMITTED_TEMPLATE.format(count=omitted))
+        batches = kept
+
+    return [
+        PART_TEMPLATE.format(part=i, parts=len(batches), sheet_name=sheet_name, failures="\n".join(batch))
+        for i, batch in enumerate(batches, start=1)
+    ]
+
+
+def build_reduce_prompt(sheet_name, explanations, max_prompt_tokens=DEFAULT_MAX_PROMPT_TOKENS, final=True):
+    """
+    Prompt combining the per-part explanations, each part trimmed to an
+    equal share of the token budget. final=False builds an intermediate
+    prompt whose answer is combined again by a later stage.
+    """
+    template = REDUCE_TEMPLATE if final else PARTIAL_REDUCE_TEMPLATE
+    overhead = estimate_tokens(template.format(sheet_name=sheet_name, parts=len(explanations), explanations=""))
+    share = max(1, (max_prompt_tokens - overhead) // max(1, len(explanations)) - 4)
+    parts = "\n\n".join(
+        f"Part {i}:\n{_truncate_to_tokens(text.strip(), share)}"
+        for i, text in enumerate(explanations, start=1)
+    )
+    return template.format(sheet_name=sheet_name, parts=len(explanations), explanations=parts)
+
+
+def reduce_fan_in(sheet_name, max_prompt_tokens=DEFAULT_MAX_PROMPT_TOKENS):
+    """
+    How many partial answers one reduce prompt combines while giving each
+    at least MIN_REDUCE_PART_TOKENS (never fewer than two)
+    """
+    overhead = estimate_tokens(REDUCE_TEMPLATE.format(sheet_name=sheet_name, parts=999, explanations=""))
+    return max(2, (max_prompt_tokens - overhead) // (MIN_REDUCE_PART_TOKENS + 4))
+
+
+def build_reduce_prompts(sheet_name, explanations, max_prompt_tokens=DEFAULT_MAX_PROMPT_TOKENS):
+    """
+    Prompts for one reduce stage. A single returned prompt is the final
+    reduce; otherwise explain each prompt and call again with the answers
+    until one remains.
+    """
+    fan_in = reduce_fan_in(sheet_name, max_prompt_tokens)
+    if len(explanations) <= fan_in:
+        return [build_reduce_prompt(sheet_name, explanations, max_prompt_tokens)]
+    return [
+        build_reduce_prompt(sheet_name, explanations[i:i + fan_in], max_prompt_tokens, final=False)
+        for i in range(0, len(explanations), fan_in)
+    ]
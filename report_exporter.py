@@ -0,0 +1,203 @@
+"""
+Streaming export of annotated validation reports.
+
+export_highlighted_xlsx writes the original sheet back with failing cells
+highlighted, using xlsxwriter's constant_memory mode; export_violations
+writes one row per violating value to Parquet (one row group per chunk)
+or CSV. Both validate the sheet chunk by chunk, so only one chunk of
+masks and cells is held at a time, never an annotated copy of the sheet.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from data_validator import compile_srs_rules, iter_check_violations, plan_rule
+
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    xlsxwriter = None
+    XLSXWRITER_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pq = None
+    PYARROW_AVAILABLE = False
+
+DEFAULT_CHUNK_SIZE = 100000
+
+# Excel's row limit, minus the header row
+EXCEL_MAX_DATA_ROWS = 1048575
+
+VIOLATION_COLUMNS = ["row", "column", "rule", "error", "value"]
+
+
+def iter_violation_chunks(data_df, srs_df, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Validate data_df chunk by chunk. Yields (chunk, failing_cells,
+    violations, failing_rows): failing_cells maps a column name to the
+    boolean mask of failing cells in that chunk, violations is a DataFrame
+    with one row per violating value (columns VIOLATION_COLUMNS; "row" is
+    the 0-based row position in data_df) and failing_rows maps (rule label,
+    error) to the number of rows in the chunk that fail the check.
+    """
+    rules = compile_srs_rules(srs_df)
+    for start in range(0, max(len(data_df), 1), chunk_size):
+        chunk = data_df.iloc[start:start + chunk_size]
+        failing_cells = {}
+        failing_rows = {}
+        records = []
+        for rule, error, cells, mask in iter_check_violations(chunk, rules):
+            mask = mask.to_numpy(dtype=bool)
+            if not mask.any():
+                continue
+            rows = start + np.flatnonzero(mask)
+            key = (str(rule["label"]), error)
+            failing_rows[key] = failing_rows.get(key, 0) + len(rows)
+            for col in cells:
+                previous = failing_cells.get(col)
+                failing_cells[col] = mask if previous is None else previous | mask
+                values = chunk[col][mask]
+                records.append(pd.DataFrame({
+                    "row": rows,
+                    "column": str(col),
+                    "rule": str(rule["label"]),
+                    "error": error,
+                    "value": values.astype(str).where(values.notnull(), None).to_numpy(dtype=object),
+                }))
+        if records:
+            violations = pd.concat(records, ignore_index=True)
+        else:
+            violations = pd.DataFrame({"row": pd.Series(dtype=np.int64)})
+            for name in VIOLATION_COLUMNS[1:]:
+                violations[name] = pd.Series(dtype=object)
+        yield chunk, failing_cells, violations, failing_rows
+
+
+def _cell_value(value):
+    if value is None or value is pd.NaT or value is pd.NA or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def export_highlighted_xlsx(data_df, srs_df, path, sheet_name="Data", chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Write data_df to path as XLSX with failing cells highlighted, plus a
+    "Failed Rules" sheet counting the failing rows of each check. Sheets
+    longer than Excel's row limit continue on "<sheet_name> (2)",
+    "<sheet_name> (3)", ... Returns the number of highlighted cells.
+    """
+    if not XLSXWRITER_AVAILABLE:
+        raise RuntimeError("xlsxwriter is required for XLSX export (pip install xlsxwriter)")
+
+    workbook = xlsxwriter.Workbook(path, {
+        "constant_memory": True,
+        "default_date_format": "yyyy-mm-dd",
+        "nan_inf_to_errors": True,
+        # Excel has no time zones; aware datetimes are written as local time
+        "remove_timezone": True,
+    })
+    header_format = workbook.add_format({"bold": True, "bg_color": "#D9E1F2"})
+    highlight = workbook.add_format({"bg_color": "#FFC7CE", "font_color": "#9C0006"})
+    highlight_date = workbook.add_format({"bg_color": "#FFC7CE", "font_color": "#9C0006",
+                                          "num_format": "yyyy-mm-dd"})
+
+    # Created first so it is the first tab; filled in once counts are known
+    summary_sheet = workbook.add_worksheet("Failed Rules")
+    columns = list(data_df.columns)
+    column_positions = {col: i for i, col in enumerate(columns)}
+
+    worksheet = None
+    sheet_row = 0
+    sheet_count = 0
+    highlighted = 0
+    error_counts = {}
+
+    def new_sheet():
+        nonlocal worksheet, sheet_row, sheet_count
+        sheet_count += 1
+        title = sheet_name if sheet_count == 1 else f"{sheet_name} ({sheet_count})"
+        worksheet = workbook.add_worksheet(re.sub(r"[\[\]:*?/\\]", "_", title)[:31])
+        worksheet.write_row(0, 0, [str(c) for c in columns], header_format)
+        worksheet.freeze_panes(1, 0)
+        sheet_row = 0
+
+    try:
+        for chunk, failing_cells, _, failing_rows in iter_violation_chunks(data_df, srs_df, chunk_size):
+            for key, count in failing_rows.items():
+                error_counts[key] = error_counts.get(key, 0) + count
+
+            failing = {column_positions[col]: mask for col, mask in failing_cells.items()}
+            values = chunk.to_numpy(dtype=object)
+            for i in range(len(chunk)):
+                if worksheet is None or sheet_row == EXCEL_MAX_DATA_ROWS:
+                    new_sheet()
+                sheet_row += 1
+                row = [_cell_value(v) for v in values[i]]
+                worksheet.write_row(sheet_row, 0, row)
+                for position, mask in failing.items():
+                    if mask[i]:
+                        value = row[position]
+                        cell_format = highlight_date if isinstance(value, pd.Timestamp) else highlight
+                        if value is None:
+                            worksheet.write_blank(sheet_row, position, None, cell_format)
+                        else:
+                            worksheet.write(sheet_row, position, value, cell_format)
+                        highlighted += 1
+        if worksheet is None:
+            new_sheet()
+
+        summary_sheet.write_row(0, 0, ["Column / Rule", "Error", "Failing rows"], header_format)
+        for i, ((label, error), count) in enumerate(error_counts.items(), start=1):
+            summary_sheet.write_row(i, 0, [label, error, count])
+        failures = []
+        for rule in compile_srs_rules(srs_df):
+            failures.extend((rule["label"], error) for error in plan_rule(rule, data_df.columns)[0])
+        for i, (label, error) in enumerate(failures, start=len(error_counts) + 1):
+            summary_sheet.write_row(i, 0, [str(label), error, None])
+    finally:
+        workbook.close()
+
+    return highlighted
+
+
+def export_violations(data_df, srs_df, path, file_format=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Write one row per violating value (row, column, rule, error, value) to
+    a Parquet or CSV file, streaming one chunk (Parquet row group) at a
+    time. file_format defaults to the path's extension. Returns the number
+    of violation rows written.
+    """
+    file_format = file_format or ("parquet" if str(path).lower().endswith((".parquet", ".pq")) else "csv")
+    written = 0
+
+    if file_format == "parquet":
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is required for Parquet export (pip install pyarrow)")
+        schema = pa.schema([("row", pa.int64()), ("column", pa.string()), ("rule", pa.string()),
+                            ("error", pa.string()), ("value", pa.string())])
+        with pq.ParquetWriter(path, schema) as writer:
+            for _, _, violations, _ in iter_violation_chunks(data_df, srs_df, chunk_size):
+                if len(violations):
+                    writer.write_table(pa.Table.from_pandas(violations, schema=schema, preserve_index=False))
+                    written += len(violations)
+        return written
+
+    if file_format != "csv":
+        raise ValueError(f"Unsupported violations format: {file_format}. Use 'parquet' or 'csv'.")
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        handle.write(",".join(VIOLATION_COLUMNS) + "\n")
+        for _, _, violations, _ in iter_violation_chunks(data_df, srs_df, chunk_size):
+            if len(violations):
+                violations.to_csv(handle, header=False, index=False)
+                written += len(violations)
+    return written
@@ -0,0 +1,100 @@
+"""
+Synthetic employee SRS and data sheets shared by the tests, the load
+tests and the backend benchmark.
+
+make_srs builds the SRS (any subset of its columns, plus expression rules)
+and make_sheet a seeded sheet that passes it, with an optional share of
+rows carrying one bad value each. Bonus is declared in the SRS but never
+present in the sheets, so validating against it always reports a missing
+column.
+"""
+
+import numpy as np
+import pandas as pd
+
+SRS_FIELDS = ["Column Name", "Type", "Required", "Min", "Max", "Expression"]
+
+# Column Name, Type, Required, Min, Max
+SRS_COLUMNS = [
+    ("Employee_ID", "string", "Yes", None, None),
+    ("Salary", "float", "Yes", 30000, 500000),
+    ("Headcount", "int", "No", 1, 100),
+    ("Active", "bool", "No", None, None),
+    ("Join_Date", "date", "Yes", None, None),
+    ("Department", "string", "No", None, None),
+    ("Bonus", "float", "No", None, None),
+    ("Employer_Contribution", "float", "No", None, None),
+]
+
+SRS_EXPRESSIONS = (
+    "Employer_Contribution <= 0.14 * Salary",
+    "if Department == 'IT' then Headcount required",
+    "if Status == 'Exited' then Exit_Date required",
+    "date(Exit_Date) >= date(Join_Date) or isnull(Exit_Date)",
+)
+
+# One per bad row, in turn: (column, value) pairs that break a rule while
+# keeping the column's dtype
+VALUE_ERRORS = [
+    [("Employee_ID", None)],
+    [("Salary", 1000.0)],
+    [("Salary", 900000.0)],
+    [("Salary", np.nan)],
+    [("Headcount", 120.0)],
+    [("Department", "IT"), ("Headcount", np.nan)],
+    [("Join_Date", None)],
+    [("Employer_Contribution", 100000.0)],
+    [("Status", "Exited"), ("Exit_Date", None)],
+    [("Status", "Exited"), ("Exit_Date", "2010-06-30")],
+]
+
+# Values of the wrong type; the columns they land in become object
+TYPE_ERRORS = [
+    [("Salary", "unknown")],
+    [("Headcount", 2.5)],
+    [("Active", "maybe")],
+    [("Join_Date", "not a date")],
+]
+
+
+def make_srs(columns=None, expressions=()):
+    """
+    SRS DataFrame for the named columns (default: all of SRS_COLUMNS, in
+    that order), followed by one column-less rule per expression
+    """
+    rows = [list(rule) + [None] for rule in SRS_COLUMNS if columns is None or rule[0] in columns]
+    rows += [[None, None, None, None, None, expression] for expression in expressions]
+    return pd.DataFrame(rows, columns=SRS_FIELDS)
+
+
+def make_sheet(n_rows, error_rate=0.0, type_errors=False, seed=0):
+    """
+    Employee sheet of n_rows that passes make_srs(expressions=SRS_EXPRESSIONS)
+    (apart from the missing Bonus column). With error_rate, that share of
+    the rows gets one of VALUE_ERRORS each, or of VALUE_ERRORS + TYPE_ERRORS
+    with type_errors=True. Dates are ISO strings.
+    """
+    rng = np.random.default_rng(seed)
+    salary = rng.uniform(30000, 500000, n_rows).round(2)
+    status = rng.choice(["Active", "Exited", "Retired"], n_rows, p=[0.8, 0.1, 0.1])
+    df = pd.DataFrame({
+        "Employee_ID": [f"EMP{i:06d}" for i in range(n_rows)],
+        "Salary": salary,
+        "Headcount": rng.integers(1, 101, n_rows).astype(float),
+        "Active": rng.choice(["yes", "no", "TRUE", "0"], n_rows),
+        "Join_Date": (pd.Timestamp("2015-01-01")
+                      + pd.to_timedelta(rng.integers(0, 3000, n_rows), unit="D")).strftime("%Y-%m-%d"),
+        "Department": rng.choice(["IT", "Finance", "HR"], n_rows),
+        "Employer_Contribution": (rng.uniform(0, 0.14, n_rows) * salary).round(2),
+        "Status": status,
+        "Exit_Date": np.where(status == "Active", None, "2024-06-30").astype(object),
+    })
+
+    errors = VALUE_ERRORS + TYPE_ERRORS if type_errors else VALUE_ERRORS
+    if type_errors:
+        df = df.astype(object)
+    bad_rows = np.flatnonzero(rng.random(n_rows) < error_rate)
+    for i, row in enumerate(bad_rows):
+        for column, value in errors[i % len(errors)]:
+            df.at[row, column] = value
+    return df
@@ -0,0 +1,640 @@
+"""
+Computed-expression and conditional SRS rules.
+
+An SRS row may carry an "Expression" such as
+
+    Employer_Contribution <= 0.14 * Salary
+    if Status == 'Exited' then Exit_Date required
+    date(Exit_Date) >= date(Join_Date)
+
+Expressions use a small, restricted grammar: column names (wrap names
+with spaces in backticks), numeric and string constants, + - * / % and
+unary minus, comparisons (including `in` with a tuple of constants),
+and/or/not, "if A then B", "X required" and the functions abs(), date(),
+notnull() and isnull(). They are parsed once into a small node tree with
+Python's ast module and never passed to eval.
+
+The tree is evaluated column-at-a-time with NumPy using SQL-style
+three-valued logic: a rule fails only where it is known to be false, so
+nulls in an operand do not count as violations ("X required" and
+notnull/isnull exist for that). The same tree is translated to DuckDB SQL
+and Polars expressions by validation_backends.
+
+A comparison between two columns takes its domain from the columns' SRS
+Types (bind_column_kinds); columns without a declared Type are compared
+as numbers only when both hold numbers, as dates when either holds
+dates, and as text otherwise.
+"""
+
+import ast
+import datetime
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+class ExpressionError(ValueError):
+    pass
+
+
+def _to_datetime(values, fmt, dayfirst=False):
+    try:
+        parsed = pd.to_datetime(values, errors="coerce", format=fmt, dayfirst=dayfirst)
+    except ValueError:
+        # Mixed UTC offsets only parse into UTC
+        parsed = pd.to_datetime(values, errors="coerce", format=fmt, dayfirst=dayfirst, utc=True)
+    if isinstance(parsed, pd.Series) and parsed.dt.tz is not None:
+        parsed = parsed.dt.tz_convert(None)
+    return parsed
+
+
+# Year-first text ("2023/04/03") is never read day-first
+_YEAR_FIRST = re.compile(r"\s*\d{4}\D")
+
+
+def _date_candidate(value):
+    return value if isinstance(value, (str, datetime.date, np.datetime64)) else None
+
+
+def parse_dates(series):
+    """
+    Parse a column as naive datetimes (offsets converted to UTC), NaT where
+    a value is not a date. Numbers and booleans are not dates (Excel
+    serials included); text and datetime values are. ISO-8601 values, the
+    form the DuckDB and Polars backends read, are parsed vectorized; the
+    rest value by value (format="mixed"), so a value's result does not
+    depend on the other values in the column or chunk. A value that reads
+    as a different date day-first and month-first ("03/04/2023") is
+    ambiguous and NaT too.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+        return pd.Series(pd.NaT, index=series.index, dtype="datetime64[us]")
+    candidates = series
+    if pd.api.types.infer_dtype(series, skipna=True) not in ("string", "empty"):
+        candidates = series.map(_date_candidate).astype(object)
+    parsed = _to_datetime(candidates, "ISO8601").astype("datetime64[us]")
+    rest = (candidates.notnull() & parsed.isnull()).to_numpy()
+    if rest.any():
+        values = candidates[rest].astype(str).reset_index(drop=True)
+        month_first = _to_datetime(values, "mixed").astype("datetime64[us]")
+        # Only a day and a month that are both <= 12 and differ can swap
+        day, month = month_first.dt.day, month_first.dt.month
+        swappable = (day <= 12) & (day != month) & ~values.str.match(_YEAR_FIRST)
+        if swappable.any():
+            day_first = _to_datetime(values[swappable], "mixed", dayfirst=True).astype("datetime64[us]")
+            ambiguous = (day_first != month_first[swappable]).reindex(values.index, fill_value=False)
+            month_first = month_first.mask(ambiguous)
+        merged = parsed.to_numpy(copy=True)
+        merged[rest] = month_first.to_numpy()
+        parsed = pd.Series(merged, index=series.index, name=series.name)
+    return parsed
+
+
+_IF_THEN = re.compile(r"^\s*if\s+(.+?)\s+then\s+(.+?)\s*$", re.IGNORECASE | re.DOTALL)
+_REQUIRED = re.compile(r"\b([A-Za-z_]\w*)\s+required\b", re.IGNORECASE)
+_STRING = r"'(?:[^'\\]|\\.)*'" + "|" + r'"(?:[^"\\]|\\.)*"'
+# Odd items of split() are string constants or backtick-quoted names
+_LITERALS = re.compile(f"({_STRING}|`[^`]+`)")
+_STRINGS = re.compile(f"({_STRING})")
+
+_ARITHMETIC = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/", ast.Mod: "%"}
+_COMPARISONS = {ast.Eq: "==", ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">="}
+_FUNCTIONS = {"abs": "num", "date": "date", "notnull": "bool", "isnull": "bool"}
+# The node tree is checked, evaluated and translated recursively, so its
+# nesting (e.g. the length of an a + b + c + ... chain) is capped
+MAX_EXPRESSION_DEPTH = 200
+
+# Comparison domain of each SRS Type
+TYPE_KINDS = {"int": "num", "integer": "num", "float": "num", "date": "date",
+              "string": "str", "str": "str", "text": "str", "bool": "str", "boolean": "str"}
+
+
+def _parse_python(text, names):
+    # Backtick-quoted column names become placeholder identifiers, then
+    # "X required" becomes notnull(X); string constants are left untouched
+    parts = _LITERALS.split(text)
+    for i in range(1, len(parts), 2):
+        if parts[i].startswith("`"):
+            names.append(parts[i][1:-1])
+            parts[i] = f"__col{len(names) - 1}"
+    parts = _STRINGS.split("".join(parts))
+    for i in range(0, len(parts), 2):
+        parts[i] = _REQUIRED.sub(r"notnull(\1)", parts[i])
+    source = "".join(parts)
+    try:
+        tree = ast.parse(source.strip(), mode="eval").body
+    except SyntaxError as e:
+        raise ExpressionError(f"cannot parse '{text}': {e.msg}") from None
+    except (RecursionError, MemoryError):
+        tree = None
+    if tree is None or _nesting_depth(tree) > MAX_EXPRESSION_DEPTH:
+        raise ExpressionError(f"expression is nested more than {MAX_EXPRESSION_DEPTH} levels deep")
+    return tree
+
+
+def _nesting_depth(node):
+    # Iterative, so that any tree ast.parse returns can be measured
+    depth = 0
+    stack = [(node, 1)]
+    while stack:
+        node, level = stack.pop()
+        depth = max(depth, level)
+        stack.extend((child, level + 1) for child in ast.iter_child_nodes(node))
+    return depth
+
+
+def _convert(node, names):
+    """
+    Translate a whitelisted Python AST into the expression node tree
+    """
+    if isinstance(node, ast.Constant) and isinstance(node.value, bool):
+        return ("bool", node.value)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return ("num", float(node.value))
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return ("str", node.value)
+    if isinstance(node, ast.Name):
+        if node.id.startswith("__col"):
+            return ("col", names[int(node.id[5:])])
+        return ("col", node.id)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        operand = _convert(node.operand, names)
+        return ("neg", operand) if isinstance(node.op, ast.USub) else operand
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        return ("not", _convert(node.operand, names))
+    if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+        return ("arith", _ARITHMETIC[type(node.op)], _convert(node.left, names), _convert(node.right, names))
+    if isinstance(node, ast.BoolOp):
+        op = "and" if isinstance(node.op, ast.And) else "or"
+        return (op, tuple(_convert(value, names) for value in node.values))
+    if isinstance(node, ast.Compare):
+        parts = []
+        left = _convert(node.left, names)
+        for op, comparator in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)):
+                if not isinstance(comparator, (ast.Tuple, ast.List)):
+                    raise ExpressionError("'in' needs a tuple of constants")
+                values = tuple(_convert(v, names) for v in comparator.elts)
+                if not values or any(v[0] not in ("num", "str") for v in values):
+                    raise ExpressionError("'in' needs a tuple of constants")
+                parts.append(("in", left, values, isinstance(op, ast.NotIn)))
+                continue
+            if type(op) not in _COMPARISONS:
+                raise ExpressionError(f"unsupported comparison: {type(op).__name__}")
+            right = _convert(comparator, names)
+            parts.append(("cmp", _COMPARISONS[type(op)], left, right))
+            left = right
+        return parts[0] if len(parts) == 1 else ("and", tuple(parts))
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS:
+            raise ExpressionError("unsupported function call in expression")
+        if len(node.args) != 1 or node.keywords:
+            raise ExpressionError(f"{node.func.id}() takes exactly one argument")
+        return ("call", node.func.id, _convert(node.args[0], names))
+    raise ExpressionError(f"unsupported syntax: {type(node).__name__}")
+
+
+def kind_of(node):
+    """
+    Static type of a node: "num", "str", "date" or "bool"; columns are
+    "col" and take the type their context requires
+    """
+    tag = node[0]
+    if tag in ("num", "str", "bool"):
+        return tag
+    if tag == "col":
+        return "col"
+    if tag in ("arith", "neg"):
+        return "num"
+    if tag == "call":
+        return _FUNCTIONS[node[1]]
+    return "bool"
+
+
+def _check(node, expected):
+    """
+    Reject ill-typed trees at parse time (e.g. 'abc' + 1, or a bare number
+    used as a condition)
+    """
+    kind = kind_of(node)
+    if kind != "col" and kind != expected:
+        raise ExpressionError(f"expected a {expected} expression, got {kind}")
+    if expected == "bool" and kind == "col":
+        raise ExpressionError(f"column '{node[1]}' used as a condition; compare it or use notnull()")
+    tag = node[0]
+    if tag == "arith":
+        _check(node[2], "num")
+        _check(node[3], "num")
+    elif tag == "neg":
+        _check(node[1], "num")
+    elif tag == "not":
+        _check(node[1], "bool")
+    elif tag in ("and", "or"):
+        for value in node[1]:
+            _check(value, "bool")
+    elif tag == "call":
+        if node[1] in ("notnull", "isnull", "date"):
+            if node[2][0] != "col":
+                raise ExpressionError(f"{node[1]}() takes a column")
+        else:
+            _check(node[2], "num")
+    elif tag == "cmp":
+        mode = compare_mode(node)
+        for side in node[2:4]:
+            # date(X) compares with date strings, checked here rather than
+            # failing the validation run
+            if mode == "date" and side[0] == "str":
+                date_constant(side[1])
+            else:
+                _check(side, mode)
+    elif tag == "in":
+        mode = node[2][0][0]
+        if any(v[0] != mode for v in node[2]):
+            raise ExpressionError("'in' values must all be numbers or all be strings")
+        _check(node[1], mode)
+
+
+def compare_mode(node, column_kind=None):
+    """
+    Comparison domain: text if either side is a string constant, date if
+    either side is date(...), numeric if either side is arithmetic or a
+    number. Two columns compare in the domain bound by bind_column_kinds,
+    or else by column_kind(name) ("num", "str" or "date" from the data):
+    numeric only when both columns are numeric.
+    """
+    if len(node) > 4:
+        return node[4]
+    kinds = {kind_of(node[2]), kind_of(node[3])}
+    if "date" in kinds:
+        return "date"
+    if "str" in kinds:
+        return "str"
+    if kinds != {"col"} or column_kind is None:
+        return "num"
+    kinds = {column_kind(node[2][1]), column_kind(node[3][1])}
+    if "date" in kinds:
+        return "date"
+    return "num" if kinds == {"num"} else "str"
+
+
+def date_constant(text):
+    """
+    Timestamp of a date constant (naive, offsets converted to UTC); raises
+    ExpressionError when the text is not a date or is ambiguous (see
+    parse_dates)
+    """
+    value = parse_dates(pd.Series([text], dtype=object)).iloc[0]
+    if pd.isnull(value):
+        if pd.notnull(_to_datetime(pd.Series([text]), "mixed").iloc[0]):
+            raise ExpressionError(f"ambiguous date constant '{text}' (day/month order); use YYYY-MM-DD")
+        raise ExpressionError(f"invalid date constant '{text}'")
+    return value
+
+
+def bind_column_kinds(node, column_kinds):
+    """
+    Bind every comparison between two columns to the domain of their
+    declared kinds (column_kinds maps column names to "num", "str" or
+    "date", e.g. TYPE_KINDS of their SRS Types). Returns the new tree;
+    raises ExpressionError for a number column compared with a text or
+    date column.
+    """
+    tag = node[0]
+    if tag == "not":
+        return ("not", bind_column_kinds(node[1], column_kinds))
+    if tag in ("and", "or"):
+        return (tag, tuple(bind_column_kinds(child, column_kinds) for child in node[1]))
+    if tag != "cmp" or node[2][0] != "col" or node[3][0] != "col" or len(node) > 4:
+        return node
+    kinds = {column_kinds.get(node[2][1]), column_kinds.get(node[3][1])} - {None}
+    if not kinds:
+        return node
+    if "num" in kinds and len(kinds) > 1:
+        raise ExpressionError(f"cannot compare columns '{node[2][1]}' and '{node[3][1]}' "
+                              f"declared as {' and '.join(sorted(kinds))}")
+    return node + ("date" if "date" in kinds else kinds.pop(),)
+
+
+@lru_cache(maxsize=1024)
+def parse_expression(text):
+    """
+    Parse an SRS expression into a node tree (cached per expression text).
+    Raises ExpressionError for anything outside the grammar.
+    """
+    text = str(text).strip()
+    match = _IF_THEN.match(text)
+    names = []
+    if match:
+        condition = _convert(_parse_python(match.group(1), names), names)
+        consequence = _convert(_parse_python(match.group(2), names), names)
+        # "if A then B" fails only where A is true and B is false
+        tree = ("or", (("not", condition), consequence))
+    else:
+        tree = _convert(_parse_python(text, names), names)
+    _check(tree, "bool")
+    return tree
+
+
+def expression_columns(node):
+    """
+    Set of column names referenced by an expression tree
+    """
+    tag = node[0]
+    if tag == "col":
+        return {node[1]}
+    columns = set()
+    for part in node[1:]:
+        if isinstance(part, tuple) and part and isinstance(part[0], str):
+            columns |= expression_columns(part)
+        elif isinstance(part, tuple):
+            for child in part:
+                if isinstance(child, tuple):
+                    columns |= expression_columns(child)
+    return columns
+
+
+# Text comparisons spell booleans one way, whatever the file reader made of
+# them: bool values and the words true/false in any case
+BOOL_TEXT = {"true": "True", "false": "False"}
+# Whole floats below this are spelled as integers in text comparisons
+INTEGRAL_TEXT_LIMIT = 1e15
+
+
+def text_constant(value):
+    """
+    A string constant as compared with column_text (true/false in any case
+    spelled "True"/"False")
+    """
+    return BOOL_TEXT.get(value.lower(), value)
+
+
+def column_text(series):
+    """
+    Text of a column for text comparisons, spelled the same by every
+    backend: booleans (and true/false text in any case) as "True"/"False",
+    datetimes as "YYYY-MM-DD" at midnight and "YYYY-MM-DD HH:MM:SS[.ffffff]"
+    otherwise (offsets converted to UTC), whole floats as integers ("3",
+    not "3.0"), other values as str()
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if series.dt.tz is not None:
+            series = series.dt.tz_convert(None)
+        text = series.dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+        text = text.where(series.dt.microsecond != 0, text.str[:19])
+        return text.where(series != series.dt.normalize(), text.str[:10])
+    text = series.astype(str)
+    if pd.api.types.is_bool_dtype(series):
+        return text
+    if pd.api.types.is_float_dtype(series):
+        # An int column with blanks reads as float in pandas but not elsewhere
+        integral = (series == np.floor(series)) & (series.abs() < INTEGRAL_TEXT_LIMIT)
+        return text.where(~integral, text.str[:-2])
+    if pd.api.types.is_numeric_dtype(series):
+        return text
+    lower = text.str.lower()
+    return text.mask(lower == "true", "True").mask(lower == "false", "False")
+
+
+def frame_column_kind(series):
+    """
+    Comparison domain of a pandas column from its dtype
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "date"
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return "num"
+    return "str"
+
+
+class _Evaluator:
+    """
+    Vectorized NumPy evaluation; every method returns (values, known)
+    """
+
+    def __init__(self, frame, numeric):
+        self.frame = frame
+        self.numeric = numeric
+        self.n = len(frame)
+
+    def column_kind(self, column):
+        return frame_column_kind(self.frame[column])
+
+    def _full(self, value, dtype):
+        return np.full(self.n, value, dtype=dtype), np.ones(self.n, dtype=bool)
+
+    def num(self, node):
+        tag = node[0]
+        if tag == "num":
+            return self._full(node[1], np.float64)
+        if tag == "col":
+            values = np.asarray(self.numeric(node[1]), dtype=np.float64)
+            return values, ~np.isnan(values)
+        if tag == "neg":
+            values, known = self.num(node[1])
+            return -values, known
+        if tag == "call":  # abs
+            values, known = self.num(node[2])
+            return np.abs(values), known
+        op, (left, left_known), (right, right_known) = node[1], self.num(node[2]), self.num(node[3])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if op == "+":
+                values = left + right
+            elif op == "-":
+                values = left - right
+            elif op == "*":
+                values = left * right
+            elif op == "/":
+                # Division by zero is unknown, as with SQL's NULLIF
+                values = np.where(right == 0, np.nan, left / right)
+            else:
+                values = np.mod(left, right)
+        return values, left_known & right_known & ~np.isnan(values)
+
+    def str(self, node):
+        if node[0] == "str":
+            return self._full(text_constant(node[1]), object)
+        series = self.frame[node[1]]
+        known = series.notnull().to_numpy()
+        return column_text(series).to_numpy(dtype=object), known
+
+    def date(self, node):
+        if node[0] == "str":
+            value = date_constant(node[1])
+            return np.full(self.n, value.to_datetime64()), np.ones(self.n, dtype=bool)
+        column = node[2] if node[0] == "call" else node
+        series = self.frame[column[1]]
+        values = parse_dates(series).to_numpy(dtype="datetime64[us]")
+        return values, ~np.isnat(values)
+
+    def bool(self, node):
+        tag = node[0]
+        if tag == "bool":
+            return self._full(node[1], bool)
+        if tag == "not":
+            values, known = self.bool(node[1])
+            return ~values, known
+        if tag in ("and", "or"):
+            values, known = self.bool(node[1][0])
+            for child in node[1][1:]:
+                other, other_known = self.bool(child)
+                # Kleene logic: a known false decides AND, a known true decides OR
+                if tag == "and":
+                    decided = (known & ~values) | (other_known & ~other)
+                    values = values & other
+                else:
+                    decided = (known & values) | (other_known & other)
+                    values = values | other
+                known = (known & other_known) | decided
+                values = np.where(known, values, False)
+            return values, known
+        if tag == "call":
+            present = self.frame[node[2][1]].notnull().to_numpy()
+            return (present if node[1] == "notnull" else ~present), np.ones(self.n, dtype=bool)
+        if tag == "in":
+            mode = node[2][0][0]
+            evaluate = self.num if mode == "num" else self.str
+            values, known = evaluate(node[1])
+            members = [text_constant(v[1]) if mode == "str" else v[1] for v in node[2]]
+            result = pd.Series(values).isin(members).to_numpy()
+            return (~result if node[3] else result), known
+        # cmp
+        evaluate = {"num": self.num, "str": self.str, "date": self.date}[compare_mode(node, self.column_kind)]
+        left, left_known = evaluate(node[2])
+        right, right_known = evaluate(node[3])
+        known = left_known & right_known
+        compare = {"==": np.equal, "!=": np.not_equal, "<": np.less, "<=": np.less_equal,
+                   ">": np.greater, ">=": np.greater_equal}[node[1]]
+        values = np.zeros(self.n, dtype=bool)
+        values[known] = compare(left[known], right[known])
+        return values, known
+
+
+def expression_violations(node, frame, numeric=None):
+    """
+    Boolean mask of rows where the expression is known to be false.
+    numeric(column) may supply already-coerced float columns so that
+    expressions reuse the coercions done by the column checks.
+    """
+    if numeric is None:
+        def numeric(column):
+            return pd.to_numeric(frame[column], errors="coerce")
+    values, known = _Evaluator(frame, numeric).bool(node)
+    return pd.Series(known & ~values, index=frame.index)
+
+
+def expression_to_sql(node, column_sql, column_kind=None):
+    """
+    Translate a tree into a DuckDB SQL boolean expression. column_sql(name,
+    mode) returns the SQL for a column in "num", "str" or "date" mode, or
+    for the raw column in "raw" mode; column_kind(name) is the column's
+    domain from its SQL type (see compare_mode). SQL's three-valued logic
+    matches the NumPy evaluation.
+    """
+    def literal(value):
+        return "'" + str(value).replace("'", "''") + "'"
+
+    def emit(node, mode):
+        tag = node[0]
+        if tag == "num":
+            return repr(node[1])
+        if tag == "str":
+            if mode == "date":
+                return f"TIMESTAMP {literal(date_constant(node[1]).isoformat(sep=' '))}"
+            return literal(text_constant(node[1]))
+        if tag == "bool":
+            return "true" if node[1] else "false"
+        if tag == "col":
+            return column_sql(node[1], mode)
+        if tag == "neg":
+            return f"(-{emit(node[1], 'num')})"
+        if tag == "arith":
+            left, right = emit(node[2], "num"), emit(node[3], "num")
+            if node[1] == "/":
+                return f"({left} / NULLIF({right}, 0))"
+            return f"({left} {node[1]} {right})"
+        if tag == "not":
+            return f"(NOT {emit(node[1], 'bool')})"
+        if tag in ("and", "or"):
+            return "(" + f" {tag.upper()} ".join(emit(child, "bool") for child in node[1]) + ")"
+        if tag == "call":
+            if node[1] in ("notnull", "isnull"):
+                check = "IS NOT NULL" if node[1] == "notnull" else "IS NULL"
+                return f"({column_sql(node[2][1], 'raw')} {check})"
+            if node[1] == "date":
+                return column_sql(node[2][1], "date")
+            return f"abs({emit(node[2], 'num')})"
+        if tag == "in":
+            mode = node[2][0][0]
+            values = ", ".join(emit(v, mode) for v in node[2])
+            return f"({emit(node[1], mode)} {'NOT IN' if node[3] else 'IN'} ({values}))"
+        mode = compare_mode(node, column_kind)
+        op = "=" if node[1] == "==" else "<>" if node[1] == "!=" else node[1]
+        return f"({emit(node[2], mode)} {op} {emit(node[3], mode)})"
+
+    return emit(node, "bool")
+
+
+def expression_to_polars(node, column_expr, column_kind=None):
+    """
+    Translate a tree into a Polars boolean expression; column_expr(name,
+    mode) and column_kind(name) work like in expression_to_sql
+    """
+    import polars as pl
+
+    def emit(node, mode):
+        tag = node[0]
+        if tag == "num":
+            return pl.lit(node[1], dtype=pl.Float64)
+        if tag == "str":
+            if mode == "date":
+                return pl.lit(date_constant(node[1]).to_pydatetime())
+            return pl.lit(text_constant(node[1]))
+        if tag == "bool":
+            return pl.lit(node[1])
+        if tag == "col":
+            return column_expr(node[1], mode)
+        if tag == "neg":
+            return -emit(node[1], "num")
+        if tag == "arith":
+            left, right = emit(node[2], "num"), emit(node[3], "num")
+            if node[1] == "+":
+                return left + right
+            if node[1] == "-":
+                return left - right
+            if node[1] == "*":
+                return left * right
+            if node[1] == "/":
+                return left / pl.when(right != 0).then(right)
+            return left % right
+        if tag == "not":
+            return ~emit(node[1], "bool")
+        if tag in ("and", "or"):
+            result = emit(node[1][0], "bool")
+            for child in node[1][1:]:
+                result = (result & emit(child, "bool")) if tag == "and" else (result | emit(child, "bool"))
+            return result
+        if tag == "call":
+            if node[1] == "notnull":
+                return column_expr(node[2][1], "raw").is_not_null()
+            if node[1] == "isnull":
+                return column_expr(node[2][1], "raw").is_null()
+            if node[1] == "date":
+                return column_expr(node[2][1], "date")
+            return emit(node[2], "num").abs()
+        if tag == "in":
+            mode = node[2][0][0]
+            values = [float(v[1]) if mode == "num" else text_constant(v[1]) for v in node[2]]
+            operand = emit(node[1], mode)
+            # is_in() is never null; keep nulls unknown like SQL
+            result = pl.when(operand.is_not_null()).then(operand.is_in(values))
+            return ~result if node[3] else result
+        mode = compare_mode(node, column_kind)
+        left, right = emit(node[2], mode), emit(node[3], mode)
+        return {"==": left == right, "!=": left != right, "<": left < right,
+                "<=": left <= right, ">": left > right, ">=": left >= right}[node[1]]
+
+    return emit(node, "bool")
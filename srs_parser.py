@@ -1,9 +1,14 @@
 import pandas as pd
 import streamlit as st
 import traceback
+from xlsx_inspector import inspect_xlsx
 
-def parse_srs_file(file):
-    """Loads CSV or XLSX and returns a dict of {sheet_name: dataframe}"""
+def parse_srs_file(file, sheet_names=None):
+    """
+    Loads CSV or XLSX and returns a dict of {sheet_name: dataframe}.
+    For XLSX, sheet_names limits loading to those sheets; the workbook is
+    inspected first so empty sheets are never parsed.
+    """
     try:
         if file.name.endswith(".csv"):
             st.info(f"📄 Parsing CSV file: {file.name}")
@@ -17,6 +22,38 @@ def parse_srs_file(file):
             # Reset file pointer to beginning
             file.seek(0)
             
+            # Read sheet names, sizes and headers from the workbook XML before loading anything
+            sheets = None
+            if file.name.endswith(".xlsx"):
+                try:
+                    sheets = inspect_xlsx(file)
+                except ValueError as inspect_error:
+                    st.warning(f"⚠️ Could not inspect workbook, loading it directly: {str(inspect_error)}")
+                file.seek(0)
+            
+            if sheets is not None:
+                st.info(f"📋 Found {len(sheets)} sheets: {', '.join(s['name'] for s in sheets)}")
+                xls = pd.ExcelFile(file, engine='openpyxl')
+                result = {}
+                for sheet in sheets:
+                    if sheet_names is not None and sheet["name"] not in sheet_names:
+                        continue
+                    if not sheet["columns"]:
+                        st.info(f"⏭️ Sheet '{sheet['name']}' is empty, skipped")
+                        continue
+                    try:
+                        df = xls.parse(sheet["name"])
+                        result[sheet["name"]] = df
+                        st.success(f"✅ Sheet '{sheet['name']}' loaded: {len(df)} rows, {len(df.columns)} columns")
+                    except Exception as sheet_error:
+                        st.error(f"❌ Error parsing sheet '{sheet['name']}': {str(sheet_error)}")
+                        continue
+                
+                if not result and sheet_names is None:
+                    raise ValueError("No sheets could be parsed from the Excel file")
+                
+                return result
+            
             # Try to read Excel file
             try:
                 xls = pd.ExcelFile(file)
@@ -24,6 +61,8 @@ def parse_srs_file(file):
                 
                 result = {}
                 for sheet_name in xls.sheet_names:
+                    if sheet_names is not None and sheet_name not in sheet_names:
+                        continue
                     try:
                         df = xls.parse(sheet_name)
                         result[sheet_name] = df
@@ -47,6 +86,8 @@ def parse_srs_file(file):
                     xls = pd.ExcelFile(file, engine='openpyxl')
                     result = {}
                     for sheet_name in xls.sheet_names:
+                        if sheet_names is not None and sheet_name not in sheet_names:
+                            continue
                         df = xls.parse(sheet_name)
                         result[sheet_name] = df
                         st.success(f"✅ Sheet '{sheet_name}' loaded with openpyxl: {len(df)} rows, {len(df.columns)} columns")
@@ -0,0 +1,68 @@
+# Tests for the single-pass column profiler
+
+import numpy as np
+import pandas as pd
+from column_profiler import ColumnProfiler, HyperLogLog, TDigest, profile_dataframe
+from data_validator import validate_data_against_srs_progressive
+
+
+def test_hyperloglog_estimate_is_close():
+    hll = HyperLogLog(p=12)
+    values = pd.Series(np.arange(200000))
+    hll.add_hashes(pd.util.hash_pandas_object(values, index=False).to_numpy())
+    assert abs(hll.estimate() - 200000) / 200000 < 0.05
+
+
+def test_tdigest_quantiles_are_close():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=100000)
+    digest = TDigest()
+    for chunk in np.array_split(values, 10):
+        digest.update(chunk)
+    for q in (0.05, 0.5, 0.95):
+        assert abs(digest.quantile(q) - np.quantile(values, q)) < 0.05
+
+
+def test_profile_is_chunk_invariant():
+    df = pd.DataFrame({
+        'Salary': [45000, 65000, 'bad', 80000, None] * 200,
+        'Department': ['IT', 'IT', 'HR', 'Finance', None] * 200,
+    })
+    whole = profile_dataframe(df, {'Salary': 'float'}, chunk_size=len(df))
+    chunked = profile_dataframe(df, {'Salary': 'float'}, chunk_size=37)
+
+    for profile in (whole, chunked):
+        salary = profile["columns"]["Salary"]
+        assert salary["null_count"] == 200
+        assert salary["min"] == 45000 and salary["max"] == 80000
+        assert salary["type_conformance"] == 0.75
+        assert profile["columns"]["Department"]["top_k"][0] == {"value": "IT", "count": 400}
+        assert profile["columns"]["Department"]["distinct_estimate"] == 3
+
+
+def test_progressive_validation_feeds_profiler():
+    df = pd.DataFrame({'Salary': np.arange(5000, dtype=float)})
+    srs = pd.DataFrame({'Column Name': ['Salary'], 'Type': ['float'], 'Required': ['Yes']})
+    profiler = ColumnProfiler()
+    for _ in validate_data_against_srs_progressive(df, srs, sample_size=100, chunk_size=1000, profiler=profiler):
+        pass
+    profile = profiler.result()
+    assert profile["rows"] == 5000
+    assert profile["columns"]["Salary"]["max"] == 4999
+
+
+def test_validator_profiles_in_the_same_pass():
+    from data_validator import validate_data_against_srs
+
+    df = pd.DataFrame({
+        'Salary': [45000, 65000, 'bad', 80000, None] * 200,
+        'Department': ['IT', 'IT', 'HR', 'Finance', None] * 200,
+    })
+    srs = pd.DataFrame({'Column Name': ['Salary'], 'Type': ['float'], 'Required': ['Yes']})
+    profiler = ColumnProfiler(expected_types={'Salary': 'float'})
+    _, failed_rules = validate_data_against_srs(df, srs, profiler=profiler)
+    profile = profiler.result()
+
+    assert {r["error"] for r in failed_rules} == {"Missing required values", "Expected float values"}
+    assert profile == profile_dataframe(df, {'Salary': 'float'})
+    assert profile["columns"]["Salary"]["type_conformance"] == 0.75
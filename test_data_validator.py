@@ -0,0 +1,161 @@
+# Tests for the SRS validation engine
+
+import numpy as np
+import pandas as pd
+from data_validator import validate_data_against_srs, validate_data_against_srs_progressive
+from sample_data import make_sheet, make_srs
+
+
+SRS_COLUMNS = ['Employee_ID', 'Salary', 'Join_Date', 'Bonus']
+
+
+def make_data(n_rows=10000):
+    data_df = make_sheet(n_rows)
+    data_df.loc[::100, 'Salary'] = 1000  # 1% below min
+    return data_df
+
+
+def test_progressive_final_result_is_exact():
+    data_df = make_data()
+    results = list(validate_data_against_srs_progressive(
+        data_df, make_srs(SRS_COLUMNS), sample_size=500, chunk_size=2000, random_state=1))
+
+    first_summary, _ = results[0]
+    assert first_summary["provisional"]
+    assert first_summary["rows_scanned"] == 500
+
+    summary, failed_rules = results[-1]
+    assert not summary["provisional"]
+    assert summary["rows_scanned"] == len(data_df)
+    by_error = {(r["column"], r["error"]): r for r in failed_rules}
+    assert ("Bonus", "Missing column") in by_error
+    below = by_error[("Salary", "Value below min: 30000.0")]
+    assert below["violations"] == 100
+    assert below["rate_ci_low"] <= 0.01 <= below["rate_ci_high"]
+
+
+def test_progressive_stops_when_error_budget_exceeded():
+    data_df = make_data()
+    results = list(validate_data_against_srs_progressive(
+        data_df, make_srs(SRS_COLUMNS), sample_size=500, chunk_size=1000,
+        error_budget=20, random_state=1))
+
+    summary, _ = results[-1]
+    assert summary["stopped_early"]
+    assert summary["provisional"]
+    assert summary["rows_scanned"] < len(data_df)
+
+
+def test_value_level_type_checks_count_and_locate_bad_values():
+    data_df = pd.DataFrame({
+        'Salary': [45000, 65000, 'n/a', 80000, 1000],
+        'Headcount': [1.0, 2.0, None, 3.5, 4.0],
+        'Active': ['yes', 'No', 'TRUE', 'maybe', None],
+        'Join_Date': ['2023-01-15', 'not a date', '2023-03-10', None, '2023-05-12'],
+    })
+    srs_df = pd.DataFrame({
+        'Column Name': ['Salary', 'Headcount', 'Active', 'Join_Date'],
+        'Type': ['float', 'int', 'bool', 'date'],
+        'Required': ['Yes', 'No', 'No', 'No'],
+        'Min': [30000, None, None, None],
+        'Max': [None, None, None, None],
+    })
+    summary, failed_rules = validate_data_against_srs(data_df, srs_df)
+    by_error = {(r["column"], r["error"]): r for r in failed_rules}
+
+    assert not summary["validation_passed"]
+    assert by_error[("Salary", "Expected float values")]["sample_rows"] == [2]
+    # The stray string does not hide the numeric range check
+    assert by_error[("Salary", "Value below min: 30000.0")]["violations"] == 1
+    assert by_error[("Headcount", "Expected integer values")]["sample_rows"] == [3]
+    assert by_error[("Active", "Expected boolean values")]["violations"] == 1
+    assert by_error[("Join_Date", "Invalid date format")]["sample_rows"] == [1]
+    assert summary["errors"] == len(failed_rules) == 5
+
+
+def test_integral_floats_pass_integer_check():
+    data_df = pd.DataFrame({'Age': [30.0, None, 41.0]})
+    srs_df = pd.DataFrame({'Column Name': ['Age'], 'Type': ['int'], 'Required': ['No']})
+    summary, failed_rules = validate_data_against_srs(data_df, srs_df)
+    assert summary["validation_passed"] and failed_rules == []
+
+
+def test_dates_in_other_formats_are_valid_regardless_of_chunking():
+    dates = ['2023-01-15', '15/03/2023', 'March 5, 2023', '2023-04-01T08:30:00', 'not a date'] * 200
+    data_df = pd.DataFrame({'Join_Date': dates})
+    srs_df = pd.DataFrame({'Column Name': ['Join_Date'], 'Type': ['date'], 'Required': ['No']})
+
+    _, failed_rules = validate_data_against_srs(data_df, srs_df)
+    (failure,) = failed_rules
+    assert failure["error"] == "Invalid date format" and failure["violations"] == 200
+    for chunk_size in (7, 333):
+        *_, (_, progressive) = validate_data_against_srs_progressive(
+            data_df, srs_df, sample_size=50, chunk_size=chunk_size, random_state=3)
+        assert [r["violations"] for r in progressive] == [200]
+
+
+def test_dates_that_read_both_day_and_month_first_are_ambiguous():
+    from srs_expressions import parse_dates
+
+    values = ['03/04/2023', '13/04/2023', '04/13/2023', '05/05/2023', '2023/04/03', 'March 5, 2023']
+    assert parse_dates(pd.Series(values)).tolist() == [
+        pd.NaT, pd.Timestamp('2023-04-13'), pd.Timestamp('2023-04-13'), pd.Timestamp('2023-05-05'),
+        pd.Timestamp('2023-04-03'), pd.Timestamp('2023-03-05')]
+
+    data_df = pd.DataFrame({'Join_Date': values, 'Exit_Date': ['2023-03-10'] * 6})
+    srs_df = pd.DataFrame({'Column Name': ['Join_Date', None], 'Type': ['date', None], 'Required': ['No', None],
+                           'Expression': [None, 'date(Exit_Date) >= date(Join_Date)']})
+    _, failed_rules = validate_data_against_srs(data_df, srs_df)
+    by_error = {r["error"]: r["sample_rows"] for r in failed_rules}
+    assert by_error["Invalid date format"] == [0]
+    # Neither reading of the ambiguous date is compared
+    assert by_error["Expression failed: date(Exit_Date) >= date(Join_Date)"] == [1, 2, 3, 4]
+
+
+def test_numbers_in_date_columns_are_not_dates():
+    # Excel serials included: only text and datetime values can be dates
+    data_df = pd.DataFrame({
+        'Serial': pd.Series([45000, 45001, 45002]),
+        'Serial_Float': [45000.0, None, 45002.5],
+        'Mixed': ['2023-01-15', 5, pd.Timestamp('2023-02-01')],
+    })
+    srs_df = pd.DataFrame({'Column Name': ['Serial', 'Serial_Float', 'Mixed'], 'Type': ['date'] * 3,
+                           'Required': ['No'] * 3})
+    _, failed_rules = validate_data_against_srs(data_df, srs_df)
+    assert {r["column"]: (r["error"], r["sample_rows"]) for r in failed_rules} == {
+        'Serial': ("Invalid date format", [0, 1, 2]),
+        'Serial_Float': ("Invalid date format", [0, 2]),
+        'Mixed': ("Invalid date format", [1]),
+    }
+
+
+def test_stratified_sample_never_exceeds_sample_size():
+    from data_validator import _stratified_sample
+
+    rng = np.random.default_rng(0)
+    for sample_size, strata in ((5, 20), (20, 20), (103, 20), (1000, 7)):
+        positions = _stratified_sample(10000, sample_size, strata, rng)
+        assert len(positions) == sample_size
+        assert len(np.unique(positions)) == sample_size
+
+
+def test_progressive_bounds_come_from_the_sample_only():
+    # Violations only in the head: sequential chunks would skew the estimate
+    data_df = make_data(10000)
+    data_df['Salary'] = 50000.0
+    data_df.loc[:999, 'Salary'] = 1000
+    results = list(validate_data_against_srs_progressive(
+        data_df, make_srs(SRS_COLUMNS), sample_size=2000, chunk_size=1000, random_state=3))
+
+    sample_summary, sample_failed = results[0]
+    sample_entry = [r for r in sample_failed if r["error"].startswith("Value below min")][0]
+    summary, failed_rules = results[1]
+    entry = [r for r in failed_rules if r["error"].startswith("Value below min")][0]
+    assert summary["provisional"]
+    # The second chunk adds exact counts but does not move the sample-based bounds
+    assert entry["violations"] > sample_entry["violations"]
+    assert (entry["rate_ci_low"], entry["rate_ci_high"]) == (sample_entry["rate_ci_low"], sample_entry["rate_ci_high"])
+    assert entry["rate_ci_low"] <= 0.1 <= entry["rate_ci_high"]
+
+    final = [r for r in results[-1][1] if r["error"].startswith("Value below min")][0]
+    assert final["violations"] == 1000 and final["rate_ci_low"] == final["rate_ci_high"] == 0.1
@@ -0,0 +1,29 @@
+# Tests for the fake Ollama server used in load tests
+
+import json
+import requests
+from fake_ollama import FakeOllamaServer
+
+
+def test_generate_non_streaming_is_deterministic():
+    with FakeOllamaServer(latency=0, tokens_per_second=0, response_tokens=4) as server:
+        payload = {"model": "mistral", "prompt": "explain these failures", "stream": False}
+        first = requests.post(server.url, json=payload, timeout=5).json()
+        second = requests.post(server.url, json=payload, timeout=5).json()
+    assert first["done"] and first["eval_count"] == 4
+    assert first["response"] == second["response"] == "explain these failures explain"
+
+
+def test_generate_streams_ndjson_tokens():
+    with FakeOllamaServer(latency=0, tokens_per_second=0, response_tokens=3) as server:
+        response = requests.post(server.url, json={"prompt": "a b", "stream": True}, stream=True, timeout=5)
+        lines = [json.loads(line) for line in response.iter_lines() if line]
+    assert [line["response"] for line in lines[:-1]] == ["a ", "b ", "a "]
+    assert lines[-1]["done"]
+
+
+def test_failure_injection():
+    with FakeOllamaServer(latency=0, tokens_per_second=0, failure_rate=1.0) as server:
+        response = requests.post(server.url, json={"prompt": "x", "stream": False}, timeout=5)
+        assert response.status_code == 500
+        assert server.failures_injected == 1
@@ -100,6 +100,21 @@ def test_mongodb_integration():
     ai_history = mongo_service.get_ai_responses_history(limit=5)
     print(f"🤖 Found {len(ai_history)} AI responses")
     
+    # Test rollup-backed analytics
+    print("\n📈 Testing validation analytics...")
+    
+    trends = mongo_service.get_validation_trends(sheet_name="Sheet1")
+    print(f"📅 Found {len(trends)} months of validation trends")
+    
+    column_rates = mongo_service.get_column_failure_rates(sheet_name="Sheet1")
+    if not any(r["column"] == "Pension_Contribution" for r in column_rates):
+        print("❌ Column failure rates missing stored failure")
+        return False
+    print(f"✅ Found {len(column_rates)} column failure-rate rows")
+    
+    top_columns = mongo_service.get_top_failing_columns(limit=3)
+    print(f"🔝 Top failing columns: {[r['column'] for r in top_columns]}")
+    
     print("\n🎉 All MongoDB tests passed successfully!")
     print("💡 You can now upload files in the Streamlit interface and they will be stored in MongoDB")
     
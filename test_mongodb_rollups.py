@@ -0,0 +1,108 @@
+# Unit tests for the validation rollups, against in-memory stand-ins for
+# the MongoDB collections (no server needed)
+
+from datetime import datetime
+
+from mongodb_service import MongoDBService
+
+
+class FakeCollection:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+        self.calls = []
+
+    def __getattr__(self, method):
+        def record(*args, **kwargs):
+            self.db.calls.append((self.name, method, args, kwargs))
+            self.calls.append((method, args, kwargs))
+        return record
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.calls = []
+        self.collections = {}
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, FakeCollection(self, name))
+
+    __getattr__ = __getitem__
+
+
+def make_service():
+    service = MongoDBService.__new__(MongoDBService)
+    service.client = object()
+    service.db = FakeDatabase()
+    service.validations_collection = service.db.validation_results
+    service.sheet_rollups_collection = service.db.validation_sheet_rollups
+    service.column_rollups_collection = service.db.validation_column_rollups
+    return service
+
+
+def make_doc(failed_rules, day=datetime(2024, 3, 15)):
+    return {"sheet_name": "Employees", "validation_date": day, "failed_rules": failed_rules}
+
+
+def test_rollup_updates_count_failures_per_column():
+    month, sheet_name, failed, by_column = MongoDBService._rollup_updates(make_doc([
+        {"column": "Salary", "error": "Value below min"},
+        {"column": "Salary", "error": "Expected float values"},
+        {"column": 2024, "error": "Missing column"},
+        {"column": None, "error": "Invalid expression"},
+        {"error": "Rule without a column"},
+    ]))
+    assert (month, sheet_name, failed) == ("2024-03", "Employees", True)
+    assert by_column == {"Salary": 2, "2024": 1, None: 2}
+    assert MongoDBService._rollup_updates(make_doc([]))[2:] == (False, {})
+
+
+def test_null_column_key_matches_the_rebuild_pipeline():
+    # $toString keeps null as null, so the incremental key must not be "None"
+    group = MongoDBService._column_rollup_pipeline("out")[2]["$group"]
+    assert group["_id"]["column"] == {"$toString": "$failed_rules.column"}
+    assert MongoDBService._rollup_column(None) is None
+    assert MongoDBService._rollup_column(7) == "7"
+
+
+def test_incremental_update_increments_sheet_and_column_rollups():
+    service = make_service()
+    service._update_validation_rollups(make_doc([{"column": "Salary", "error": "x"}, {"column": None, "error": "y"}]))
+
+    (method, args, kwargs), = service.sheet_rollups_collection.calls
+    assert method == "update_one" and kwargs == {"upsert": True}
+    assert args == ({"month": "2024-03", "sheet_name": "Employees"}, {"$inc": {"runs": 1, "failed_runs": 1}})
+
+    (method, args, kwargs), = service.column_rollups_collection.calls
+    assert method == "bulk_write"
+    filters = [op._filter for op in args[0]]
+    assert {f["column"] for f in filters} == {"Salary", None}
+
+
+def test_rebuild_builds_into_staging_and_renames_over_the_rollups():
+    service = make_service()
+    assert service.rebuild_validation_rollups() is True
+
+    calls = [(name, method) for name, method, _, _ in service.db.calls if method != "create_index"]
+    assert calls == [
+        ("validation_sheet_rollups_staging", "drop"),
+        ("validation_column_rollups_staging", "drop"),
+        ("validation_results", "aggregate"),
+        ("validation_results", "aggregate"),
+        ("validation_sheet_rollups_staging", "rename"),
+        ("validation_column_rollups_staging", "rename"),
+    ]
+    # The live rollups are never emptied or replaced document by document
+    assert not service.sheet_rollups_collection.calls and not service.column_rollups_collection.calls
+
+    aggregates = [args[0] for name, method, args, _ in service.db.calls if method == "aggregate"]
+    assert [pipeline[-1] for pipeline in aggregates] == [
+        {"$out": "validation_sheet_rollups_staging"},
+        {"$out": "validation_column_rollups_staging"},
+    ]
+    renames = [(args, kwargs) for name, method, args, kwargs in service.db.calls if method == "rename"]
+    assert renames == [(("validation_sheet_rollups",), {"dropTarget": True}),
+                       (("validation_column_rollups",), {"dropTarget": True})]
+    # Unique indexes exist on the staging collections before the rename
+    indexed = {name for name, method, _, _ in service.db.calls if method == "create_index"}
+    assert indexed == {"validation_sheet_rollups_staging", "validation_column_rollups_staging"}
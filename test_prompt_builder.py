@@ -0,0 +1,61 @@
+# Tests for the token-budgeted prompt builder
+
+from prompt_builder import (MIN_REDUCE_PART_TOKENS, build_failure_prompts, build_reduce_prompts,
+                            estimate_tokens, group_failures)
+
+
+def test_failures_are_grouped_deduplicated_and_ranked():
+    failed_rules = [
+        {"column": "Salary", "error": "Value below min: 30000"},
+        {"column": "Salary", "error": "Value below min: 30000"},
+        {"column": "Bonus", "error": "Missing column"},
+        {"column": "Name", "error": "Missing required values", "violations": 12},
+    ]
+    groups = group_failures(failed_rules)
+    assert [(g["column"], g["kind"]) for g in groups] == [
+        ("Bonus", "Missing column"),
+        ("Name", "Missing required values"),
+        ("Salary", "Value below min"),
+    ]
+    assert groups[2]["occurrences"] == 2 and groups[2]["details"] == ["30000"]
+
+
+def test_small_report_is_a_single_prompt():
+    prompts = build_failure_prompts("Employees", [{"column": "Salary", "error": "Expected float values"}])
+    assert len(prompts) == 1
+    assert "- Salary: Expected float values" in prompts[0]
+
+
+def test_large_report_is_split_within_budget():
+    failed_rules = [{"column": f"Column_{i}", "error": "Missing required values"} for i in range(500)]
+    prompts = build_failure_prompts("Employees", failed_rules, max_prompt_tokens=400, max_prompts=None)
+    assert len(prompts) > 1
+    assert all(estimate_tokens(p) <= 400 for p in prompts)
+    assert sum(p.count("- Column_") for p in prompts) == 500
+
+
+def test_map_prompts_are_capped_keeping_the_most_severe_groups():
+    failed_rules = [{"column": f"Column_{i}", "error": "Missing required values", "violations": i}
+                    for i in range(5000)]
+    prompts = build_failure_prompts("Employees", failed_rules, max_prompt_tokens=400, max_prompts=8)
+    assert len(prompts) == 8
+    assert all(estimate_tokens(p) <= 400 for p in prompts)
+    assert "- Column_4999:" in prompts[0]
+    shown = sum(p.count("- Column_") for p in prompts)
+    assert f"... and {5000 - shown} more lower-severity failure groups" in prompts[-1]
+
+
+def test_reduce_runs_in_stages_within_budget():
+    answers = ["x" * 5000] * 40
+    stages = 0
+    while True:
+        prompts = build_reduce_prompts("Employees", answers, max_prompt_tokens=1500)
+        stages += 1
+        assert all(estimate_tokens(p) <= 1500 for p in prompts)
+        # Every part keeps a useful share instead of being cut to a few tokens
+        assert all(("x" * MIN_REDUCE_PART_TOKENS * 4) in p or ("y" * MIN_REDUCE_PART_TOKENS * 4) in p
+                   for p in prompts)
+        if len(prompts) == 1:
+            break
+        answers = ["y" * 5000] * len(prompts)
+    assert stages == 2 and "another step will combine" not in prompts[0]
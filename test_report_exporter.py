@@ -0,0 +1,76 @@
+# Tests for streaming report export
+
+import pandas as pd
+import pytest
+from report_exporter import export_highlighted_xlsx, export_violations
+from sample_data import make_sheet, make_srs
+
+
+def make_inputs():
+    data_df = make_sheet(5, type_errors=True)[['Employee_ID', 'Salary', 'Join_Date']]
+    data_df['Salary'] = [45000, 'n/a', 25000, 80000, None]
+    data_df['Join_Date'] = pd.to_datetime(data_df['Join_Date'].where([True, True, False, True, True]))
+    return data_df, make_srs(['Salary', 'Join_Date', 'Department'])
+
+
+def test_violations_csv_streams_every_chunk(tmp_path):
+    data_df, srs_df = make_inputs()
+    path = tmp_path / "violations.csv"
+    written = export_violations(data_df, srs_df, str(path), chunk_size=2)
+    violations = pd.read_csv(path)
+    assert written == len(violations) == 4
+    assert sorted(zip(violations["row"], violations["error"])) == [
+        (1, "Expected float values"),
+        (2, "Missing required values"),
+        (2, "Value below min: 30000.0"),
+        (4, "Missing required values"),
+    ]
+
+
+def test_violations_parquet_has_one_row_group_per_failing_chunk(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    data_df, srs_df = make_inputs()
+    path = tmp_path / "violations.parquet"
+    assert export_violations(data_df, srs_df, str(path), chunk_size=2) == 4
+    assert pq.ParquetFile(path).metadata.num_row_groups == 3
+    values = pd.read_parquet(path)["value"]
+    assert values[:2].tolist() == ["n/a", "25000"]
+    assert values[2:].isnull().all()
+
+
+def test_highlighted_xlsx(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    pytest.importorskip("xlsxwriter")
+    data_df, srs_df = make_inputs()
+    path = tmp_path / "report.xlsx"
+    assert export_highlighted_xlsx(data_df, srs_df, str(path), chunk_size=2) == 4
+
+    workbook = openpyxl.load_workbook(path)
+    assert workbook.sheetnames == ["Failed Rules", "Data"]
+    sheet = workbook["Data"]
+    assert [c.value for c in sheet[1]] == ['Employee_ID', 'Salary', 'Join_Date']
+    assert sheet["B3"].fill.fgColor.rgb.endswith("FFC7CE")  # 'n/a'
+    assert sheet["C4"].fill.fgColor.rgb.endswith("FFC7CE")  # missing date
+    assert not sheet["B2"].fill.fgColor.rgb.endswith("FFC7CE")
+    summary = [[c.value for c in row] for row in workbook["Failed Rules"].iter_rows(min_row=2)]
+    assert ["Department", "Missing column", None] in summary
+    assert ["Salary", "Missing required values", 1] in summary
+
+
+def test_highlighted_xlsx_counts_failing_rows_and_writes_aware_datetimes(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    pytest.importorskip("xlsxwriter")
+    data_df = pd.DataFrame({
+        'A': [1, 5, 7, 2],
+        'B': [2, 4, 6, 3],
+        'Updated': pd.date_range("2024-01-01", periods=4, freq="D", tz="Asia/Kolkata"),
+    })
+    srs_df = pd.DataFrame({'Column Name': [None], 'Expression': ['A <= B']})
+    path = tmp_path / "report.xlsx"
+    # Two failing rows, each highlighting both cells the expression reads
+    assert export_highlighted_xlsx(data_df, srs_df, str(path), chunk_size=3) == 4
+
+    workbook = openpyxl.load_workbook(path)
+    summary = [[c.value for c in row] for row in workbook["Failed Rules"].iter_rows(min_row=2)]
+    assert summary == [["A, B", "Expression failed: A <= B", 2]]
+    assert workbook["Data"]["C2"].value == pd.Timestamp("2024-01-01").to_pydatetime()
@@ -0,0 +1,120 @@
+# Tests for computed-expression and conditional SRS rules
+
+import pandas as pd
+import pytest
+from data_validator import validate_data_against_srs
+from srs_expressions import ExpressionError, expression_violations, parse_expression
+
+
+def make_data():
+    return pd.DataFrame({
+        'Salary': [50000, 60000, None, 70000],
+        'Employer_Contribution': [7000, 9000, 100, None],
+        'Status': ['Active', 'Exited', 'Exited', 'Active'],
+        'Exit Date': [None, None, '2024-01-31', None],
+        'Join_Date': ['2020-01-01', '2021-01-01', '2024-02-01', '2019-01-01'],
+    })
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("Employer_Contribution <= 0.14 * Salary", [False, True, False, False]),
+    ("if Status == 'Exited' then `Exit Date` required", [False, True, False, False]),
+    ("date(`Exit Date`) >= date(Join_Date)", [False, False, True, False]),
+    ("Status in ('Active', 'Retired')", [False, True, True, False]),
+    ("date(Join_Date) < '2021-01-01' or Salary > 65000", [False, True, False, False]),
+    ("not isnull(Salary) and Salary / (Salary - 50000) > 0", [False, False, True, False]),
+])
+def test_expression_violations(expression, expected):
+    mask = expression_violations(parse_expression(expression), make_data())
+    assert mask.tolist() == expected
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os').system('ls')",
+    "Salary.real > 0",
+    "Salary + 'x' > 1",
+    "Salary",
+    "[x for x in Salary]",
+    "Salary > ",
+])
+def test_unsafe_or_invalid_expressions_are_rejected(expression):
+    with pytest.raises(ExpressionError):
+        parse_expression(expression)
+
+
+def test_expressions_run_with_column_checks():
+    srs_df = pd.DataFrame({
+        'Column Name': ['Salary', None, None, None],
+        'Type': ['float', None, None, None],
+        'Required': ['Yes', None, None, None],
+        'Expression': [
+            'Employer_Contribution <= 0.14 * Salary',
+            "if Status == 'Exited' then `Exit Date` required",
+            'Bonus > 0',
+            'Salary >',
+        ],
+    })
+    summary, failed_rules = validate_data_against_srs(make_data(), srs_df)
+    assert failed_rules[0] == {"column": "Salary", "error": "Missing required values",
+                               "violations": 1, "sample_rows": [2]}
+    assert failed_rules[1]["error"] == "Expression failed: Employer_Contribution <= 0.14 * Salary"
+    assert failed_rules[1]["sample_rows"] == [1]
+    assert failed_rules[2]["column"] == "Exit Date, Status"
+    assert failed_rules[3] == {"column": "Bonus", "error": "Expression references missing column: Bonus"}
+    assert failed_rules[4]["column"] == "Expression"
+    assert failed_rules[4]["error"].startswith("Invalid expression:")
+    assert summary["errors"] == 5
+
+
+def test_column_comparisons_use_the_column_kinds():
+    data = pd.DataFrame({
+        'Plan': ['Gold', 'Gold', 'Silver', None],
+        'Chosen_Plan': ['Gold', 'Silver', 'Silver', 'Gold'],
+        'Exit_Date': ['2024-01-31', '15/01/2019', None, '2023-06-30'],
+        'Join_Date': ['2020-01-01', '2020-01-01', '2020-01-01', '2024-01-01'],
+        'Salary': ['50000', '60000', '70000', '80000'],
+        'Tier': ['A', 'B', 'A', 'C'],
+    })
+    srs_df = pd.DataFrame({
+        'Column Name': ['Exit_Date', 'Join_Date', 'Salary', 'Tier', None, None, None],
+        'Type': ['date', 'date', 'float', 'string', None, None, None],
+        'Expression': [None, None, None, None, 'Plan == Chosen_Plan', 'Exit_Date >= Join_Date', 'Salary < Tier'],
+    })
+    _, failed_rules = validate_data_against_srs(data, srs_df)
+    by_error = {r["error"]: r for r in failed_rules}
+    # Undeclared text columns compare as text; declared dates as dates
+    assert by_error["Expression failed: Plan == Chosen_Plan"]["sample_rows"] == [1]
+    assert by_error["Expression failed: Exit_Date >= Join_Date"]["sample_rows"] == [1, 3]
+    assert by_error["Invalid expression: cannot compare columns 'Salary' and 'Tier' declared as num and str"]
+
+
+def test_invalid_date_constants_are_invalid_expressions():
+    with pytest.raises(ExpressionError, match="invalid date constant 'notadate'"):
+        parse_expression("date(Join_Date) >= 'notadate'")
+    srs_df = pd.DataFrame({'Column Name': [None], 'Expression': ["date(Join_Date) >= 'notadate'"]})
+    summary, failed_rules = validate_data_against_srs(make_data(), srs_df)
+    assert failed_rules == [{"column": "Expression",
+                             "error": "Invalid expression: invalid date constant 'notadate'"}]
+    with pytest.raises(ExpressionError, match="ambiguous date constant '03/04/2023'"):
+        parse_expression("date(Join_Date) >= '03/04/2023'")
+    assert parse_expression("date(Join_Date) >= '13/04/2023'")
+
+
+def test_deeply_nested_expressions_are_invalid_expressions():
+    chain = "Salary > " + " + ".join(["1"] * 20000)
+    with pytest.raises(ExpressionError, match="nested more than"):
+        parse_expression(chain)
+    with pytest.raises(ExpressionError, match="nested more than"):
+        parse_expression("Salary > " + "-" * 500 + "1")
+    assert parse_expression("Salary > " + " + ".join(["1"] * 100))
+    srs_df = pd.DataFrame({'Column Name': [None], 'Expression': [chain]})
+    summary, failed_rules = validate_data_against_srs(make_data(), srs_df)
+    assert failed_rules[0]["error"].startswith("Invalid expression: expression is nested more than")
+    assert summary["errors"] == 1
+
+
+def test_required_inside_string_constants_is_text():
+    assert parse_expression("Status == 'not required'") == ("cmp", "==", ("col", "Status"), ("str", "not required"))
+    tree = parse_expression("if Note != \"`x` required\" then `Exit Date` required")
+    assert tree == ("or", (("not", ("cmp", "!=", ("col", "Note"), ("str", "`x` required"))),
+                           ("call", "notnull", ("col", "Exit Date"))))
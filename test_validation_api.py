@@ -0,0 +1,166 @@
+# Tests for the validation HTTP API, driven through the ASGI interface
+
+import asyncio
+import io
+import json
+
+import pandas as pd
+from sample_data import make_sheet, make_srs
+from validation_api import MAX_JSON_BODY_BYTES, ValidationAPI
+
+BOUNDARY = "testboundary123"
+SRS_COLUMNS = ['Employee_ID', 'Salary', 'Department']
+
+
+def make_data():
+    return make_sheet(40, error_rate=0.25, type_errors=True)
+
+
+def multipart(files=(), fields=()):
+    body = b""
+    for name, value in fields:
+        body += (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n"
+                 f"{value}\r\n").encode()
+    for name, filename, content in files:
+        body += (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"{name}\"; filename=\"{filename}\"\r\n"
+                 f"Content-Type: application/octet-stream\r\n\r\n").encode() + content + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+def csv_bytes(df):
+    return df.to_csv(index=False).encode()
+
+
+def call(api, method, path, body=b"", content_type=None, query=b"", chunk_size=7):
+    """
+    Run one request through the ASGI app, delivering the body in small
+    chunks. Returns (status, headers, parsed JSON).
+    """
+    async def run():
+        chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] or [b""]
+        messages = [{"type": "http.request", "body": c, "more_body": i < len(chunks) - 1}
+                    for i, c in enumerate(chunks)]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        headers = [(b"content-type", content_type.encode())] if content_type else []
+        scope = {"type": "http", "method": method, "path": path, "query_string": query, "headers": headers}
+        await api(scope, receive, send)
+        return sent
+
+    sent = asyncio.run(run())
+    return sent[0]["status"], dict(sent[0]["headers"]), json.loads(sent[1]["body"])
+
+
+def post_multipart(api, path, files=(), fields=(), query=b""):
+    return call(api, "POST", path, multipart(files, fields), f"multipart/form-data; boundary={BOUNDARY}", query)
+
+
+def test_uploads_split_across_chunks_arrive_intact():
+    # Boundary-like lines inside the file must not end the part
+    content = b"a,b\r\n1,2\r\n--not-the-boundary\r\n" * 50
+    api = ValidationAPI(workers=1)
+    try:
+        status, _, body = call(api, "POST", "/parse", multipart(files=[("file", "data.csv", content)]),
+                               f"multipart/form-data; boundary={BOUNDARY}", chunk_size=5)
+        assert status == 200 and body["sheets"]["Sheet1"]["rows"] == len(pd.read_csv(io.BytesIO(content)))
+    finally:
+        api.shutdown()
+
+
+def test_srs_plans_are_resident_and_reused():
+    api = ValidationAPI(workers=2)
+    try:
+        status, _, srs = post_multipart(api, "/srs", files=[("file", "srs.csv", csv_bytes(make_srs(SRS_COLUMNS)))])
+        assert status == 200 and srs["sheets"] == {"Sheet1": 3}
+        plan = api.get_plan(srs["srs_id"])
+        status, _, again = post_multipart(api, "/srs", files=[("file", "srs.csv", csv_bytes(make_srs(SRS_COLUMNS)))])
+        assert again["srs_id"] == srs["srs_id"] and api.get_plan(srs["srs_id"]) is plan
+        status, _, info = call(api, "GET", f"/srs/{srs['srs_id']}")
+        assert status == 200 and info["sheets"] == {"Sheet1": 3}
+    finally:
+        api.shutdown()
+
+
+def test_validate_by_srs_id_matches_direct_validation():
+    from data_validator import validate_data_against_srs
+
+    api = ValidationAPI(workers=2)
+    try:
+        _, _, srs = post_multipart(api, "/srs", files=[("file", "srs.csv", csv_bytes(make_srs(SRS_COLUMNS)))])
+        status, headers, result = post_multipart(api, "/validate", files=[("file", "data.csv", csv_bytes(make_data()))],
+                                                 query=f"srs_id={srs['srs_id']}".encode())
+        assert status == 200 and b"x-response-time-ms" in headers
+        sheet = result["results"]["Sheet1"]
+        expected_summary, expected_failed = validate_data_against_srs(
+            pd.read_csv(io.StringIO(make_data().to_csv(index=False))), make_srs(SRS_COLUMNS))
+        assert sheet["result_summary"] == expected_summary
+        assert sheet["failed_rules"] == expected_failed
+
+        # SRS uploaded alongside the data, without a prior /srs call
+        status, _, inline = post_multipart(api, "/validate", files=[("file", "data.csv", csv_bytes(make_data())),
+                                                                     ("srs", "srs.csv", csv_bytes(make_srs(SRS_COLUMNS)))])
+        assert status == 200 and inline["results"] == result["results"]
+    finally:
+        api.shutdown()
+
+
+def test_errors_and_metrics():
+    api = ValidationAPI(workers=1)
+    try:
+        status, _, body = post_multipart(api, "/validate", files=[("file", "data.csv", b"a\n1\n")],
+                                         query=b"srs_id=0123456789abcdef")
+        assert status == 404
+        status, _, body = post_multipart(api, "/parse", files=[("file", "data.txt", b"x")])
+        assert status == 415
+        status, _, body = call(api, "GET", "/parse")
+        assert status == 405 and "error" in body
+        status, _, body = call(api, "GET", "/nowhere")
+        assert status == 404 and "error" in body
+        status, _, body = call(api, "POST", "/parse", b"{}", "application/json")
+        assert status == 415
+        status, _, body = call(api, "POST", "/explain", b"[" + b"0," * MAX_JSON_BODY_BYTES + b"0]", "application/json",
+                               chunk_size=64 * 1024)
+        assert status == 413
+        status, _, body = call(api, "POST", "/explain", b"{not json", "application/json")
+        assert status == 400
+        status, _, body = post_multipart(api, "/parse", files=[("file", "data.csv", csv_bytes(make_data()))])
+        assert status == 200 and body["sheets"]["Sheet1"] == {"rows": 40, "columns": list(make_data().columns)}
+
+        status, _, metrics = call(api, "GET", "/metrics")
+        routes = metrics["routes"]
+        assert routes["/parse"]["count"] == 4 and routes["/validate"]["count"] == 1
+        assert routes["/explain"]["count"] == 2 and routes["unmatched"]["count"] == 1
+        assert set(routes["/parse"]["latency_ms"]) == {"mean", "p50", "p95", "p99", "max"}
+    finally:
+        api.shutdown()
+
+
+def test_excel_sheets_are_inspected_and_matched_before_loading():
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        make_data().to_excel(writer, sheet_name="Employees", index=False)
+        pd.DataFrame({"Other": [1]}).to_excel(writer, sheet_name="Notes", index=False)
+    srs_buffer = io.BytesIO()
+    with pd.ExcelWriter(srs_buffer, engine="openpyxl") as writer:
+        make_srs(SRS_COLUMNS).to_excel(writer, sheet_name="Employee", index=False)
+        make_srs(SRS_COLUMNS).to_excel(writer, sheet_name="Payroll", index=False)
+
+    api = ValidationAPI(workers=1)
+    try:
+        status, _, parsed = post_multipart(api, "/parse", files=[("file", "data.xlsx", buffer.getvalue())])
+        assert status == 200
+        assert parsed["sheets"]["Employees"] == {"rows": 40, "columns": list(make_data().columns)}
+
+        status, _, result = post_multipart(api, "/validate", files=[("file", "data.xlsx", buffer.getvalue()),
+                                                                     ("srs", "srs.xlsx", srs_buffer.getvalue())])
+        assert status == 200
+        assert result["results"]["Employees"]["srs_sheet"] == "Employee"
+        assert result["results"]["Notes"] == {"error": "No matching SRS sheet"}
+    finally:
+        api.shutdown()
@@ -0,0 +1,129 @@
+# Parity tests: every validation backend must match the pandas results
+
+import pandas as pd
+import pytest
+from sample_data import SRS_EXPRESSIONS, make_sheet, make_srs
+from validation_backends import BACKENDS, available_backends, validate_file_against_srs
+
+OTHER_BACKENDS = [name for name in BACKENDS if name != "pandas"]
+
+
+# The shared rules plus expressions that exercise more of the grammar
+EXPRESSIONS = SRS_EXPRESSIONS + (
+    "date(Exit_Date) >= date(Join_Date) and Status in ('Exited', 'Retired')",
+    'abs(Headcount - 50) % 7 != 3 or not notnull(Department)',
+    'Bonus > 0',
+    'Exit_Date >= Join_Date',
+    "Department == Status or isnull(Department)",
+)
+
+
+def make_data(n_rows=2000):
+    data_df = make_sheet(n_rows, error_rate=0.2, type_errors=True, seed=7)
+    data_df.loc[::11, 'Department'] = None
+    return data_df
+
+
+@pytest.fixture(params=["csv", "parquet"])
+def data_file(request, tmp_path):
+    data_df = make_data()
+    path = tmp_path / f"data.{request.param}"
+    if request.param == "csv":
+        data_df.to_csv(path, index=False)
+    else:
+        pytest.importorskip("pyarrow")
+        data_df.astype(str).where(data_df.notnull(), None).to_parquet(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize("backend", OTHER_BACKENDS)
+def test_backend_matches_pandas(backend, data_file):
+    if backend not in available_backends():
+        pytest.skip(f"{backend} is not installed")
+    srs_df = make_srs(expressions=EXPRESSIONS)
+    expected = validate_file_against_srs(data_file, srs_df, backend="pandas")
+    actual = validate_file_against_srs(data_file, srs_df, backend=backend)
+    assert actual == expected
+    assert not expected[0]["validation_passed"]
+    assert {r["error"] for r in expected[1]} >= {
+        "Missing column", "Missing required values", "Expected float values",
+        "Expected integer values", "Expected boolean values", "Invalid date format",
+        "Value below min: 30000.0", "Value above max: 100.0",
+        "Expression references missing column: Bonus",
+        *(f"Expression failed: {expression}" for expression in EXPRESSIONS if expression != 'Bonus > 0'),
+    }
+
+
+@pytest.mark.parametrize("backend", OTHER_BACKENDS)
+def test_backend_matches_pandas_on_clean_data(backend, tmp_path):
+    if backend not in available_backends():
+        pytest.skip(f"{backend} is not installed")
+    path = tmp_path / "clean.csv"
+    make_sheet(500).to_csv(path, index=False)
+    srs_df = make_srs(['Employee_ID', 'Salary', 'Headcount', 'Active', 'Join_Date'], expressions=SRS_EXPRESSIONS)
+    expected = validate_file_against_srs(str(path), srs_df, backend="pandas")
+    assert expected == validate_file_against_srs(str(path), srs_df, backend=backend)
+    assert expected[0]["validation_passed"]
+
+
+@pytest.mark.parametrize("backend", OTHER_BACKENDS)
+def test_backend_rereads_values_past_the_inferred_rows_as_text(backend, tmp_path):
+    if backend not in available_backends():
+        pytest.skip(f"{backend} is not installed")
+    # Numeric for far more rows than either reader samples to infer types
+    headcount = [str(i % 90 + 1) for i in range(30000)] + ["many", "7.5"]
+    path = tmp_path / "late.csv"
+    pd.DataFrame({'Headcount': headcount}).to_csv(path, index=False)
+    srs_df = make_srs(['Headcount'])
+    expected = validate_file_against_srs(str(path), srs_df, backend="pandas")
+    assert expected == validate_file_against_srs(str(path), srs_df, backend=backend)
+    assert {r["error"]: r["sample_rows"] for r in expected[1]} == {"Expected integer values": [30000, 30001]}
+
+
+# Text comparisons on columns the readers type differently: booleans,
+# datetimes (with and without an offset), nullable ints and bool-like text
+TYPED_EXPRESSIONS = [
+    "Flag == 'True'", "Flag != 'false'", "Flag == Word",
+    "Updated != '2020-01-01'", "Updated == '2020-01-01 10:00:00'", "Updated == '2020-01-02 10:00:00.250000'",
+    "Stamped == '2019-12-31 18:30:00'", "date(Updated) >= '2020-01-01 05:00'",
+    "Count == '1'", "Count in ('3', '4')", "Word == 'true'", "Word in ('True', 'x')",
+]
+
+
+def make_typed_data(n_rows=12):
+    return pd.DataFrame({
+        'Flag': pd.Series([True, False, None] * (n_rows // 3), dtype="boolean"),
+        'Updated': pd.to_datetime(["2020-01-01", "2020-01-01 10:00", "2020-01-02 10:00:00.25", None] * (n_rows // 4),
+                                  format="ISO8601"),
+        'Stamped': pd.to_datetime(["2020-01-01", "2020-01-01 10:00", None] * (n_rows // 3),
+                                  format="ISO8601").tz_localize("Asia/Kolkata"),
+        'Count': pd.Series([1, None, 3, 4] * (n_rows // 4), dtype="Int64"),
+        'Word': ["true", "FALSE", "True", "x"] * (n_rows // 4),
+    })
+
+
+@pytest.mark.parametrize("backend", OTHER_BACKENDS)
+def test_backend_matches_pandas_on_typed_parquet(backend, tmp_path):
+    if backend not in available_backends():
+        pytest.skip(f"{backend} is not installed")
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "typed.parquet"
+    make_typed_data().to_parquet(path, index=False)
+    srs_df = pd.DataFrame({'Column Name': [None] * len(TYPED_EXPRESSIONS), 'Expression': TYPED_EXPRESSIONS})
+    expected = validate_file_against_srs(str(path), srs_df, backend="pandas")
+    assert expected == validate_file_against_srs(str(path), srs_df, backend=backend)
+    assert {r["error"].removeprefix("Expression failed: ") for r in expected[1]} == set(TYPED_EXPRESSIONS)
+
+
+@pytest.mark.parametrize("backend", OTHER_BACKENDS)
+def test_backend_matches_pandas_on_csv_bool_and_blank_int_columns(backend, tmp_path):
+    if backend not in available_backends():
+        pytest.skip(f"{backend} is not installed")
+    # pandas and Polars read Flag as booleans and Count as floats; DuckDB as text and ints
+    path = tmp_path / "typed.csv"
+    make_typed_data()[['Flag', 'Count', 'Word']].to_csv(path, index=False)
+    expressions = [e for e in TYPED_EXPRESSIONS if 'Updated' not in e and 'Stamped' not in e]
+    srs_df = pd.DataFrame({'Column Name': [None] * len(expressions), 'Expression': expressions})
+    expected = validate_file_against_srs(str(path), srs_df, backend="pandas")
+    assert expected == validate_file_against_srs(str(path), srs_df, backend=backend)
+    assert len(expected[1]) == len(expressions)
@@ -0,0 +1,151 @@
+# Tests for XLSX inspection from the workbook XML
+
+import io
+import re
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+from xlsx_inspector import column_index, inspect_xlsx, parse_dimension, sheet_names
+
+
+def make_workbook(path, engine):
+    employees = pd.DataFrame({
+        'Employee_ID': [f"EMP{i:04d}" for i in range(120)],
+        'Salary': np.linspace(30000, 90000, 120),
+        'Department': ['IT', 'HR', 'Finance'] * 40,
+    })
+    with pd.ExcelWriter(path, engine=engine) as writer:
+        employees.to_excel(writer, sheet_name='Employees', index=False)
+        pd.DataFrame({'Code': [1, 2], 2024: ['a', 'b']}).to_excel(writer, sheet_name='Codes', index=False)
+        pd.DataFrame().to_excel(writer, sheet_name='Empty', index=False)
+    return path
+
+
+@pytest.mark.parametrize("engine", ["openpyxl", "xlsxwriter"])
+def test_matches_pandas(tmp_path, engine):
+    path = make_workbook(tmp_path / f"book_{engine}.xlsx", engine)
+    sheets = inspect_xlsx(path)
+    assert [s['name'] for s in sheets] == sheet_names(path) == pd.ExcelFile(path).sheet_names
+    for sheet in sheets:
+        df = pd.read_excel(path, sheet_name=sheet['name'])
+        assert sheet['rows'] == len(df)
+        assert sheet['columns'] == len(df.columns)
+        assert sheet['headers'] == list(df.columns)
+    assert sheets[0]['dimension'] == 'A1:C121'
+
+
+def test_hidden_sheets_and_blank_headers(tmp_path):
+    import openpyxl
+
+    workbook = openpyxl.Workbook()
+    visible = workbook.active
+    visible.title = 'Data'
+    visible.append(['ID', None, 'Amount'])
+    visible.append([1, 'x', 2.5])
+    hidden = workbook.create_sheet('Lookup')
+    hidden.sheet_state = 'hidden'
+    hidden.append(['Key'])
+    path = tmp_path / "hidden.xlsx"
+    workbook.save(path)
+
+    data, lookup = inspect_xlsx(path)
+    assert data['headers'] == list(pd.read_excel(path, sheet_name='Data').columns) == ['ID', 'Unnamed: 1', 'Amount']
+    assert (data['rows'], data['columns']) == (1, 3)
+    assert lookup['state'] == 'hidden' and lookup['rows'] == 0 and lookup['headers'] == ['Key']
+
+
+def test_duplicate_headers_are_renamed_like_pandas(tmp_path):
+    import openpyxl
+
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(['Salary', 'Salary', 'Salary.1', None, 'Unnamed: 3', 2024, '2024', 2024, 'Salary'])
+    sheet.append(list(range(9)))
+    path = tmp_path / "duplicates.xlsx"
+    workbook.save(path)
+
+    headers = inspect_xlsx(path)[0]['headers']
+    assert headers == list(pd.read_excel(path).columns)
+    assert headers == ['Salary', 'Salary.2', 'Salary.1', 'Unnamed: 3.1', 'Unnamed: 3', 2024, '2024', '2024.1', 'Salary.3']
+
+
+def test_counts_from_a1_like_pandas(tmp_path):
+    import datetime
+    import openpyxl
+
+    workbook = openpyxl.Workbook()
+    offset = workbook.active
+    offset.title = 'Offset'
+    for col, name in enumerate(['ID', 'Amount', 'Note', None, 'x', 'y'], start=2):
+        offset.cell(3, col, name)
+    for row in range(4, 7):
+        for col in range(2, 8):
+            offset.cell(row, col, row * col)
+    dated = workbook.create_sheet('Dated')
+    dated.append([None, 'ID', datetime.datetime(2024, 1, 1), datetime.date(2023, 5, 6), datetime.time(10, 30)])
+    dated.append([None, 1, 2.5, 3, 4])
+    dated.cell(1, 6, 45292).number_format = '0'
+    path = tmp_path / "offset.xlsx"
+    workbook.save(path)
+
+    for count_rows in (False, True):
+        offset_info, dated_info = inspect_xlsx(path, count_rows=count_rows)
+        assert (offset_info['rows'], offset_info['columns']) == (5, 7)
+        assert offset_info['headers'] == [f"Unnamed: {i}" for i in range(7)]
+        assert dated_info['headers'] == ['Unnamed: 0', 'ID', datetime.datetime(2024, 1, 1),
+                                         datetime.datetime(2023, 5, 6), datetime.time(10, 30), 45292]
+        for info in (offset_info, dated_info):
+            df = pd.read_excel(path, sheet_name=info['name'])
+            assert (info['rows'], info['columns'], info['headers']) == (len(df), len(df.columns), list(df.columns))
+
+
+def test_scans_rows_without_dimension(tmp_path):
+    source = make_workbook(tmp_path / "book.xlsx", "openpyxl")
+    stripped = tmp_path / "no_dimension.xlsx"
+    with zipfile.ZipFile(source) as zin, zipfile.ZipFile(stripped, "w", zipfile.ZIP_DEFLATED) as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if item.filename.startswith("xl/worksheets/"):
+                data = re.sub(rb"<dimension [^>]*/>", b"", data)
+            zout.writestr(item, data)
+
+    sheets = inspect_xlsx(stripped)
+    assert sheets[0]['dimension'] is None
+    assert (sheets[0]['rows'], sheets[0]['columns']) == (120, 3)
+    assert [(s['rows'], s['columns']) for s in sheets] == [(s['rows'], s['columns']) for s in inspect_xlsx(source)]
+
+
+def test_inline_strings_and_file_objects(tmp_path):
+    import xlsxwriter
+
+    # constant_memory mode writes strings inline instead of to sharedStrings.xml
+    path = tmp_path / "inline.xlsx"
+    workbook = xlsxwriter.Workbook(str(path), {'constant_memory': True})
+    notes = workbook.add_worksheet('Notes')
+    notes.write_row(0, 0, ['Column / Rule', 'Error', 'Failing rows'])
+    notes.write_row(1, 0, ['Salary', 'below Min', 1])
+    data = workbook.add_worksheet('Data')
+    data.write_row(0, 0, ['Salary', 'Name'])
+    for row, values in enumerate([[50000, 'a'], [-1, 'b'], [70000]], start=1):
+        data.write_row(row, 0, values)
+    workbook.close()
+
+    with zipfile.ZipFile(path) as archive:
+        assert b't="inlineStr"' in archive.read("xl/worksheets/sheet1.xml")
+    with open(path, "rb") as handle:
+        sheets = inspect_xlsx(io.BytesIO(handle.read()))
+    assert [s['name'] for s in sheets] == ['Notes', 'Data']
+    assert sheets[0]['headers'] == ['Column / Rule', 'Error', 'Failing rows'] and sheets[0]['rows'] == 1
+    assert sheets[1]['headers'] == ['Salary', 'Name'] and sheets[1]['rows'] == 3
+
+
+def test_helpers_and_invalid_files(tmp_path):
+    assert column_index("A") == 0 and column_index("AA") == 26 and column_index("XFD") == 16383
+    assert parse_dimension("B2:D10") == ((1, 1), (9, 3))
+    assert parse_dimension("A1") == ((0, 0), (0, 0))
+    bad = tmp_path / "bad.xlsx"
+    bad.write_bytes(b"not a zip")
+    with pytest.raises(ValueError):
+        inspect_xlsx(bad)
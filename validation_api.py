@@ -0,0 +1,502 @@
+"""
+HTTP API for the validator (ASGI).
+
+Run with any ASGI server, e.g.:
+
+    uvicorn validation_api:app --host 0.0.0.0 --port 8000
+
+Endpoints:
+    POST /parse              multipart "file" -> sheets with row/column counts
+    POST /srs                multipart "file" -> compiles the SRS, returns srs_id
+    GET  /srs/{srs_id}       compiled rule counts per sheet
+    POST /validate           multipart "file" (+ "srs" file or srs_id query
+                             parameter, optional backend / srs_sheet)
+    POST /explain            JSON {"sheet_name", "failed_rules"} -> explanation
+    GET  /metrics            per-route request counts and latency percentiles
+    GET  /health
+
+The app is built on Starlette. Uploads are parsed as they arrive by
+python-multipart and spooled to temporary files, so a request never holds
+a whole file in memory; JSON bodies are capped at MAX_JSON_BODY_BYTES.
+Errors, including unknown routes and methods, come back as JSON
+{"error": ...} bodies. Compiled SRS rules are kept resident by srs_id (the
+SHA-256 prefix of the SRS file), so repeat validations skip parsing and
+compiling the SRS. Parsing, validation and explanation run on a thread
+pool, leaving the event loop free to accept and stream other requests.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from difflib import get_close_matches
+
+import numpy as np
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.datastructures import MutableHeaders
+from starlette.exceptions import HTTPException
+from starlette.middleware import Middleware
+from starlette.requests import ClientDisconnect
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from data_validator import compile_srs_rules, validate_data_against_srs
+from validation_backends import _file_format, available_backends, validate_file_against_srs
+from xlsx_inspector import inspect_xlsx
+
+API_WORKERS = int(os.getenv("VALIDATION_API_WORKERS", str(min(8, (os.cpu_count() or 1) + 2))))
+MAX_SRS_PLANS = int(os.getenv("VALIDATION_API_MAX_SRS_PLANS", "64"))
+MAX_FORM_FIELD_BYTES = 1024 * 1024
+MAX_JSON_BODY_BYTES = 1024 * 1024
+LATENCY_WINDOW = 1000
+
+
+class UploadedFile:
+    """
+    A multipart file part saved to a named temporary file
+    """
+
+    def __init__(self, filename, path, size=0):
+        self.filename = filename
+        self.path = path
+        self.size = size
+
+
+def save_upload(name, upload, tmp_dir):
+    """
+    Copy a Starlette UploadFile (spooled by python-multipart) to a named
+    file under tmp_dir, as the readers and backends take paths
+    """
+    original = os.path.basename((upload.filename or "").replace("\\", "/")) or name
+    fd, path = tempfile.mkstemp(dir=tmp_dir, suffix=os.path.splitext(original)[1].lower())
+    upload.file.seek(0)
+    with os.fdopen(fd, "wb") as handle:
+        shutil.copyfileobj(upload.file, handle, 1024 * 1024)
+        size = handle.tell()
+    return UploadedFile(original, path, size)
+
+
+class JSONBody(JSONResponse):
+    """
+    JSON response that serializes anything else (timestamps, NumPy
+    scalars) as its str()
+    """
+
+    def render(self, content):
+        return json.dumps(content, default=str).encode("utf-8")
+
+
+class ResponseTimer:
+    """
+    ASGI middleware that adds an x-response-time-ms header to every response
+    and records its latency under the matched route's path template
+    """
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        response = {"status": 500, "elapsed": None}
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["elapsed"] = time.perf_counter() - started
+                MutableHeaders(scope=message).append("x-response-time-ms", f"{response['elapsed'] * 1000:.3f}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            route = scope.get("route")
+            elapsed = response["elapsed"] if response["elapsed"] is not None else time.perf_counter() - started
+            self.metrics.record(route.path if route is not None else "unmatched", elapsed, response["status"])
+
+
+class LatencyMetrics:
+    """
+    Per-route request counts, error counts and a rolling window of latencies
+    """
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, seconds, status):
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = {"count": 0, "errors": 0, "latencies": deque(maxlen=self.window)}
+                self._routes[route] = entry
+            entry["count"] += 1
+            if status >= 500:
+                entry["errors"] += 1
+            entry["latencies"].append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            routes = {route: (entry["count"], entry["errors"], list(entry["latencies"]))
+                      for route, entry in self._routes.items()}
+        result = {}
+        for route, (count, errors, latencies) in routes.items():
+            latencies_ms = np.array(latencies) * 1000
+            result[route] = {
+                "count": count,
+                "errors": errors,
+                "latency_ms": {
+                    "mean": round(float(latencies_ms.mean()), 3),
+                    "p50": round(float(np.percentile(latencies_ms, 50)), 3),
+                    "p95": round(float(np.percentile(latencies_ms, 95)), 3),
+                    "p99": round(float(np.percentile(latencies_ms, 99)), 3),
+                    "max": round(float(latencies_ms.max()), 3),
+                },
+            }
+        return result
+
+
+def read_sheets(path, filename):
+    """
+    Load an uploaded CSV/Parquet/Excel file as {sheet_name: DataFrame}
+    """
+    file_format = _file_format(filename)
+    if file_format == "csv":
+        return {"Sheet1": pd.read_csv(path)}
+    if file_format == "parquet":
+        return {"Sheet1": pd.read_parquet(path)}
+    return pd.read_excel(path, sheet_name=None)
+
+
+def match_srs_sheet(sheet_name, srs_sheets, srs_sheet=None):
+    """
+    The SRS sheet to validate sheet_name against: srs_sheet when given,
+    otherwise the closest sheet name (as in the Streamlit app), otherwise
+    the only sheet of a single-sheet SRS
+    """
+    if srs_sheet is not None:
+        if srs_sheet not in srs_sheets:
+            raise HTTPException(404, f"SRS sheet not found: {srs_sheet}")
+        return srs_sheet
+    matched = get_close_matches(sheet_name, list(srs_sheets), n=1, cutoff=0.6)
+    if matched:
+        return matched[0]
+    if len(srs_sheets) == 1:
+        return next(iter(srs_sheets))
+    return None
+
+
+class ValidationAPI:
+    """
+    The ASGI application: a Starlette app over the worker pool, the resident
+    SRS plans and the latency metrics.
+    """
+
+    def __init__(self, workers=API_WORKERS, max_srs_plans=MAX_SRS_PLANS):
+        self.workers = workers
+        self.max_srs_plans = max_srs_plans
+        self.metrics = LatencyMetrics()
+        self._pool = None
+        self._plans = OrderedDict()
+        self._plans_lock = threading.Lock()
+        self.app = Starlette(
+            routes=[
+                Route("/health", self._endpoint(self.health), methods=["GET"]),
+                Route("/metrics", self._endpoint(self.get_metrics), methods=["GET"]),
+                Route("/parse", self._endpoint(self.parse), methods=["POST"]),
+                Route("/srs", self._endpoint(self.upload_srs), methods=["POST"]),
+                Route("/srs/{srs_id}", self._endpoint(self.get_srs), methods=["GET"]),
+                Route("/validate", self._endpoint(self.validate), methods=["POST"]),
+                Route("/explain", self._endpoint(self.explain), methods=["POST"]),
+            ],
+            middleware=[Middleware(ResponseTimer, metrics=self.metrics)],
+            exception_handlers={HTTPException: self._http_error, ValueError: self._value_error},
+            lifespan=self._lifespan,
+        )
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="validation-api")
+        return self._pool
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    async def run_in_pool(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+
+    # SRS plans
+
+    def compile_srs(self, path, filename):
+        """
+        Parse and compile an SRS file, keeping the plans resident. Returns
+        (srs_id, plan); a file seen before is not parsed again.
+        """
+        digest = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for block in iter(lambda: handle.read(1024 * 1024), b""):
+                digest.update(block)
+        srs_id = digest.hexdigest()[:16]
+        plan = self.get_plan(srs_id)
+        if plan is None:
+            sheets = {str(name): compile_srs_rules(df) for name, df in read_sheets(path, filename).items()}
+            plan = {"srs_id": srs_id, "filename": filename, "sheets": sheets, "created": time.time()}
+            with self._plans_lock:
+                self._plans[srs_id] = plan
+                while len(self._plans) > self.max_srs_plans:
+                    self._plans.popitem(last=False)
+        return srs_id, plan
+
+    def get_plan(self, srs_id):
+        with self._plans_lock:
+            plan = self._plans.get(srs_id)
+            if plan is not None:
+                self._plans.move_to_end(srs_id)
+            return plan
+
+    @staticmethod
+    def describe_plan(plan):
+        return {
+            "srs_id": plan["srs_id"],
+            "filename": plan["filename"],
+            "sheets": {name: len(rules) for name, rules in plan["sheets"].items()},
+        }
+
+    # Handlers; each returns the JSON payload of a 200 response
+
+    async def health(self, request):
+        return {"status": "ok", "backends": available_backends(), "srs_plans": len(self._plans)}
+
+    async def get_metrics(self, request):
+        return {"workers": self.workers, "routes": self.metrics.snapshot()}
+
+    async def parse(self, request):
+        _, files = await self.read_form(request)
+        upload = self._require_file(files, "file")
+
+        def parse_file():
+            if upload.filename.lower().endswith(".xlsx"):
+                # Sizes and headers straight from the workbook XML, without loading the sheets
+                try:
+                    inspected = inspect_xlsx(upload.path)
+                except ValueError as e:
+                    raise HTTPException(400, str(e))
+                return {
+                    "filename": upload.filename,
+                    "sheets": {
+                        sheet["name"]: {"rows": sheet["rows"], "columns": [str(c) for c in sheet["headers"]]}
+                        for sheet in inspected
+                    },
+                }
+            sheets = read_sheets(upload.path, upload.filename)
+            return {
+                "filename": upload.filename,
+                "sheets": {
+                    str(name): {"rows": len(df), "columns": [str(c) for c in df.columns]}
+                    for name, df in sheets.items()
+                },
+            }
+
+        return await self.run_in_pool(parse_file)
+
+    async def upload_srs(self, request):
+        _, files = await self.read_form(request)
+        upload = self._require_file(files, "file")
+        _, plan = await self.run_in_pool(self.compile_srs, upload.path, upload.filename)
+        return self.describe_plan(plan)
+
+    async def get_srs(self, request):
+        plan = self.get_plan(request.path_params["srs_id"])
+        if plan is None:
+            raise HTTPException(404, "Unknown srs_id")
+        return self.describe_plan(plan)
+
+    async def validate(self, request):
+        fields, files = await self.read_form(request)
+        upload = self._require_file(files, "file")
+        params = {**request.query_params, **fields}
+        backend = params.get("backend", "pandas")
+        if backend not in available_backends():
+            raise HTTPException(400, f"Unavailable validation backend: {backend}. "
+                                     f"Choose from {', '.join(available_backends())}.")
+
+        if "srs" in files:
+            srs_upload = files["srs"]
+            _, plan = await self.run_in_pool(self.compile_srs, srs_upload.path, srs_upload.filename)
+        elif params.get("srs_id"):
+            plan = self.get_plan(params["srs_id"])
+            if plan is None:
+                raise HTTPException(404, "Unknown srs_id; upload the SRS to /srs first")
+        else:
+            raise HTTPException(400, "Provide an 'srs' file part or an srs_id")
+        srs_sheet = params.get("srs_sheet")
+
+        def run_validation():
+            file_format = _file_format(upload.filename)
+            if file_format != "excel":
+                # Single-table files go to the backend directly, without a DataFrame for non-pandas backends
+                sheet_names = ["Sheet1"]
+                sheets = None
+            else:
+                if backend != "pandas":
+                    raise HTTPException(400, "Excel files can only be validated with the pandas backend")
+                if upload.filename.lower().endswith(".xlsx"):
+                    sheet_names = [sheet["name"] for sheet in inspect_xlsx(upload.path) if sheet["columns"]]
+                else:
+                    sheet_names = pd.ExcelFile(upload.path).sheet_names
+                sheet_names = [str(name) for name in sheet_names]
+
+            # Match sheet names first so only sheets with an SRS counterpart are loaded
+            matches = {name: match_srs_sheet(name, plan["sheets"], srs_sheet) for name in sheet_names}
+            if file_format == "excel":
+                to_load = [name for name, matched in matches.items() if matched is not None]
+                sheets = pd.read_excel(upload.path, sheet_name=to_load) if to_load else {}
+
+            results = {}
+            for sheet_name in sheet_names:
+                matched = matches[sheet_name]
+                if matched is None:
+                    results[sheet_name] = {"error": "No matching SRS sheet"}
+                    continue
+                rules = plan["sheets"][matched]
+                if sheets is None:
+                    result_summary, failed_rules = validate_file_against_srs(upload.path, rules, backend=backend)
+                else:
+                    result_summary, failed_rules = validate_data_against_srs(sheets[sheet_name], rules)
+                results[sheet_name] = {
+                    "srs_sheet": matched,
+                    "result_summary": result_summary,
+                    "failed_rules": failed_rules,
+                }
+            return results
+
+        started = time.perf_counter()
+        results = await self.run_in_pool(run_validation)
+        return {
+            "srs_id": plan["srs_id"],
+            "backend": backend,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+            "results": results,
+        }
+
+    async def explain(self, request):
+        body = await self.read_json(request)
+        if not isinstance(body, dict) or not isinstance(body.get("failed_rules"), list):
+            raise HTTPException(400, "Expected a JSON object with a 'failed_rules' list")
+        sheet_name = str(body.get("sheet_name", "Sheet1"))
+
+        def run_explain():
+            # Imported lazily: ollama_agent connects to MongoDB at import time
+            from ollama_agent import explain_validation_results
+            kwargs = {}
+            if body.get("max_prompt_tokens"):
+                kwargs["max_prompt_tokens"] = int(body["max_prompt_tokens"])
+            return explain_validation_results(sheet_name, body["failed_rules"], file_id=body.get("file_id"), **kwargs)
+
+        return {"sheet_name": sheet_name, "explanation": await self.run_in_pool(run_explain)}
+
+    # Request plumbing
+
+    async def read_form(self, request):
+        """
+        Parse a multipart upload into (fields, files). python-multipart
+        spools the file parts as they arrive; they are then copied to named
+        files in a temporary directory that is removed after the request.
+        """
+        content_type = request.headers.get("content-type", "")
+        if not content_type.startswith("multipart/form-data"):
+            raise HTTPException(415, "Expected a multipart/form-data upload")
+        tmp_dir = request.state.tmp_dir = tempfile.mkdtemp(prefix="validation_api_")
+        fields, files = {}, {}
+        async with request.form(max_part_size=MAX_FORM_FIELD_BYTES) as form:
+            for name, value in form.multi_items():
+                if isinstance(value, str):
+                    fields[name] = value
+                else:
+                    files[name] = await self.run_in_pool(save_upload, name, value, tmp_dir)
+        return fields, files
+
+    @staticmethod
+    async def read_json(request):
+        """
+        The request's JSON body, refused with 413 past MAX_JSON_BODY_BYTES
+        """
+        too_large = HTTPException(413, f"JSON body larger than {MAX_JSON_BODY_BYTES} bytes")
+        if int(request.headers.get("content-length") or 0) > MAX_JSON_BODY_BYTES:
+            raise too_large
+        body = bytearray()
+        async for chunk in request.stream():
+            body.extend(chunk)
+            if len(body) > MAX_JSON_BODY_BYTES:
+                raise too_large
+        try:
+            return json.loads(body or b"null")
+        except ValueError:
+            raise HTTPException(400, "Invalid JSON body")
+
+    @staticmethod
+    def _require_file(files, name):
+        upload = files.get(name)
+        if upload is None:
+            raise HTTPException(400, f"Missing file part '{name}'")
+        try:
+            _file_format(upload.filename)
+        except ValueError as e:
+            raise HTTPException(415, str(e))
+        return upload
+
+    def _endpoint(self, handler):
+        """
+        Starlette endpoint for a handler: a JSON response of its payload, 500
+        for unexpected errors, and the request's uploads removed afterwards
+        """
+        async def endpoint(request):
+            try:
+                return JSONBody(await handler(request))
+            except (HTTPException, ValueError):
+                raise
+            except ClientDisconnect:
+                raise HTTPException(400, "Client disconnected")
+            except Exception as e:
+                print(f"❌ Error handling {request.method} {request.url.path}: {e}")
+                return JSONBody({"error": "Internal server error"}, status_code=500)
+            finally:
+                tmp_dir = getattr(request.state, "tmp_dir", None)
+                if tmp_dir:
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        return endpoint
+
+    @staticmethod
+    async def _http_error(request, exc):
+        return JSONBody({"error": exc.detail}, status_code=exc.status_code, headers=exc.headers)
+
+    @staticmethod
+    async def _value_error(request, exc):
+        return JSONBody({"error": str(exc)}, status_code=400)
+
+    @asynccontextmanager
+    async def _lifespan(self, app):
+        yield
+        self.shutdown()
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+
+
+app = ValidationAPI()
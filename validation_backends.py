@@ -0,0 +1,430 @@
+"""
+Pluggable execution backends for SRS validation of CSV/Parquet files.
+
+The pandas backend (default) loads the file and runs
+validate_data_against_srs. The DuckDB and Polars backends translate the
+compiled SRS rules into a single plain aggregate query (SQL, or Polars
+lazy expressions) counting every check in one multithreaded pass, then
+fetch the first offending rows with a LIMIT query for the failing checks
+only. Column types are inferred natively (dates stay text, as in pandas),
+so casts run only on text columns; a file whose later values do not fit
+the inferred types is re-read with every column as text. All backends
+return the same (result_summary, failed_rules) as pandas; see
+test_validation_backends.py for the parity suite and backend_benchmark.py
+for timings.
+
+Non-pandas backends parse dates in ISO-8601 form only; pandas also accepts
+other unambiguous formats value by value (see srs_expressions.parse_dates).
+"""
+
+import os
+
+import pandas as pd
+
+from data_validator import BOOL_VALUES, SAMPLE_ROWS, compile_srs_rules, plan_rule, validate_data_against_srs
+from srs_expressions import INTEGRAL_TEXT_LIMIT, expression_to_polars, expression_to_sql
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    duckdb = None
+    DUCKDB_AVAILABLE = False
+
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    pl = None
+    POLARS_AVAILABLE = False
+
+# pandas.read_csv's default NA markers, so every backend sees the same nulls
+CSV_NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+# ISO-8601 dates and datetimes are normalized to this one format before parsing
+ISO_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S%.f"
+
+# Rows the Polars CSV reader looks at to infer column types
+CSV_INFER_SCHEMA_ROWS = 10000
+
+
+def _file_format(path):
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    if ext in (".xlsx", ".xls"):
+        return "excel"
+    raise ValueError(f"Unsupported file type: {path}. Please use .csv, .parquet or .xlsx files.")
+
+
+def _assemble_results(rules, columns, total_rows, stats):
+    """
+    Build (result_summary, failed_rules) in the pandas format from per-check
+    statistics: stats[(label, error)] = (violations, sample_rows)
+    """
+    failed_rules = []
+    for rule in rules:
+        failures, checks = plan_rule(rule, columns)
+        for error in failures:
+            failed_rules.append({"column": rule["label"], "error": error})
+        for error, _, _ in checks:
+            violations, sample_rows = stats[(rule["label"], error)]
+            if violations:
+                failed_rules.append({
+                    "column": rule["label"],
+                    "error": error,
+                    "violations": int(violations),
+                    "sample_rows": [int(r) for r in sorted(sample_rows)[:SAMPLE_ROWS]],
+                })
+    result_summary = {
+        "total_rows": int(total_rows),
+        "total_columns": len(columns),
+        "validation_passed": not failed_rules,
+        "errors": len(failed_rules),
+    }
+    return result_summary, failed_rules
+
+
+class PandasBackend:
+    name = "pandas"
+
+    def validate(self, path, srs_df, sheet_name=0):
+        file_format = _file_format(path)
+        if file_format == "csv":
+            data_df = pd.read_csv(path)
+        elif file_format == "parquet":
+            data_df = pd.read_parquet(path)
+        else:
+            data_df = pd.read_excel(path, sheet_name=sheet_name)
+        return validate_data_against_srs(data_df, srs_df)
+
+
+class DuckDBBackend:
+    name = "duckdb"
+
+    NUMERIC_TYPES = ("TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "UTINYINT", "USMALLINT",
+                     "UINTEGER", "UBIGINT", "FLOAT", "DOUBLE", "REAL")
+
+    def __init__(self, threads=None):
+        self.threads = threads
+
+    @staticmethod
+    def _quote(identifier):
+        return '"' + str(identifier).replace('"', '""') + '"'
+
+    @staticmethod
+    def _literal(value):
+        return "'" + str(value).replace("'", "''") + "'"
+
+    def _source(self, path, file_format, all_varchar=False):
+        if file_format == "csv":
+            nulls = ", ".join(self._literal(v) for v in CSV_NULL_VALUES)
+            # Only numbers are typed; dates and booleans stay text as in pandas
+            types = "all_varchar=true" if all_varchar else "auto_type_candidates=['BIGINT', 'DOUBLE', 'VARCHAR']"
+            return f"read_csv({self._literal(path)}, header=true, {types}, nullstr=[{nulls}])"
+        if file_format == "parquet":
+            return f"read_parquet({self._literal(path)})"
+        raise ValueError("The duckdb backend supports .csv and .parquet files only")
+
+    def _numeric(self, col, col_type):
+        if col_type == "VARCHAR":
+            return f"TRY_CAST(trim({col}) AS DOUBLE)"
+        if col_type in self.NUMERIC_TYPES or col_type.startswith("DECIMAL"):
+            return f"CAST({col} AS DOUBLE)"
+        return "CAST(NULL AS DOUBLE)"
+
+    def _nonconforming(self, col, col_type, dtype):
+        if dtype in ("int", "integer"):
+            num = self._numeric(col, col_type)
+            return f"{col} IS NOT NULL AND NOT coalesce({num} = floor({num}), false)"
+        if dtype == "float":
+            return f"{col} IS NOT NULL AND {self._numeric(col, col_type)} IS NULL"
+        if dtype == "date":
+            if col_type == "VARCHAR":
+                return f"{col} IS NOT NULL AND TRY_CAST({col} AS TIMESTAMP) IS NULL"
+            if col_type.startswith("DATE") or col_type.startswith("TIMESTAMP"):
+                return "false"
+            # Numbers and booleans are not dates
+            return f"{col} IS NOT NULL"
+        # bool / boolean
+        if col_type == "BOOLEAN":
+            return "false"
+        values = ", ".join(self._literal(v) for v in BOOL_VALUES)
+        return f"{col} IS NOT NULL AND lower(trim(CAST({col} AS VARCHAR))) NOT IN ({values})"
+
+    @staticmethod
+    def _text(col, col_type):
+        # Spelled like srs_expressions.column_text
+        if col_type == "BOOLEAN":
+            return f"CASE WHEN {col} THEN 'True' WHEN NOT {col} THEN 'False' END"
+        if col_type.startswith("DATE") or col_type.startswith("TIMESTAMP"):
+            ts = f"timezone('UTC', {col})" if col_type.endswith("WITH TIME ZONE") else f"CAST({col} AS TIMESTAMP)"
+            return (f"CASE WHEN {ts} = date_trunc('day', {ts}) THEN strftime({ts}, '%Y-%m-%d') "
+                    f"WHEN microsecond({ts}) % 1000000 = 0 THEN strftime({ts}, '%Y-%m-%d %H:%M:%S') "
+                    f"ELSE strftime({ts}, '%Y-%m-%d %H:%M:%S.%f') END")
+        if col_type == "VARCHAR":
+            return f"CASE lower({col}) WHEN 'true' THEN 'True' WHEN 'false' THEN 'False' ELSE {col} END"
+        if col_type in ("DOUBLE", "FLOAT"):
+            return (f"CASE WHEN {col} = trunc({col}) AND abs({col}) < {INTEGRAL_TEXT_LIMIT!r} "
+                    f"THEN CAST(CAST({col} AS BIGINT) AS VARCHAR) ELSE CAST({col} AS VARCHAR) END")
+        return f"CAST({col} AS VARCHAR)"
+
+    def _column_sql(self, columns):
+        def column_sql(name, mode):
+            col, col_type = self._quote(name), columns[name]
+            if mode == "num":
+                return self._numeric(col, col_type)
+            if mode == "str":
+                return self._text(col, col_type)
+            if mode == "date":
+                if col_type == "VARCHAR":
+                    return f"TRY_CAST({col} AS TIMESTAMP)"
+                if col_type.startswith("DATE") or col_type.startswith("TIMESTAMP"):
+                    return f"CAST({col} AS TIMESTAMP)"
+                return "CAST(NULL AS TIMESTAMP)"
+            return col
+        return column_sql
+
+    def _column_kind(self, columns):
+        def column_kind(name):
+            col_type = columns[name]
+            if col_type in self.NUMERIC_TYPES or col_type.startswith("DECIMAL"):
+                return "num"
+            if col_type.startswith("DATE") or col_type.startswith("TIMESTAMP"):
+                return "date"
+            return "str"
+        return column_kind
+
+    def _condition(self, rule, kind, param, columns):
+        if kind == "expression":
+            # Violated where the expression is known to be false
+            return f"NOT {expression_to_sql(param, self._column_sql(columns), self._column_kind(columns))}"
+        col, col_type = self._quote(rule["column"]), columns[rule["column"]]
+        if kind == "required":
+            return f"{col} IS NULL"
+        if kind == "type":
+            return self._nonconforming(col, col_type, rule["type"])
+        op = "<" if kind == "min" else ">"
+        return f"{self._numeric(col, col_type)} {op} {float(param)!r}"
+
+    def _run(self, con, rules, source):
+        schema = con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()
+        columns = {name: col_type.upper() for name, col_type, *_ in schema}
+
+        conditions = []
+        keys = []
+        for rule in rules:
+            for error, kind, param in plan_rule(rule, columns)[1]:
+                conditions.append(self._condition(rule, kind, param, columns))
+                keys.append((rule["label"], error))
+
+        selects = ["count(*)"] + [f"count(*) FILTER (WHERE {condition})" for condition in conditions]
+        counts = con.execute(f"SELECT {', '.join(selects)} FROM {source}").fetchone()
+
+        # One more pass numbers the rows in file order (a streaming window)
+        # and keeps the first sample rows of every failing check at once
+        failing = [i for i in range(len(keys)) if counts[1 + i]]
+        samples = {}
+        if failing:
+            selects = [f"min(__row, {SAMPLE_ROWS}) FILTER (WHERE {conditions[i]})" for i in failing]
+            row = con.execute(f"SELECT {', '.join(selects)} "
+                              f"FROM (SELECT row_number() OVER () - 1 AS __row, * FROM {source})").fetchone()
+            samples = dict(zip(failing, row))
+        stats = {key: (counts[1 + i], [int(r) for r in samples.get(i, [])]) for i, key in enumerate(keys)}
+        return _assemble_results(rules, list(columns), counts[0], stats)
+
+    def validate(self, path, srs_df, sheet_name=None):
+        rules = compile_srs_rules(srs_df)
+        file_format = _file_format(path)
+
+        con = duckdb.connect()
+        try:
+            if self.threads:
+                con.execute(f"SET threads TO {int(self.threads)}")
+            try:
+                return self._run(con, rules, self._source(path, file_format))
+            except duckdb.ConversionException:
+                # A value past the sniffed rows does not fit its inferred type
+                return self._run(con, rules, self._source(path, file_format, all_varchar=True))
+        finally:
+            con.close()
+
+
+class PolarsBackend:
+    name = "polars"
+
+    def _frame(self, path, file_format, infer_schema=True):
+        if file_format == "csv":
+            if not infer_schema:
+                return pl.scan_csv(path, infer_schema=False, null_values=CSV_NULL_VALUES)
+            return pl.scan_csv(path, infer_schema_length=CSV_INFER_SCHEMA_ROWS, null_values=CSV_NULL_VALUES)
+        if file_format == "parquet":
+            return pl.scan_parquet(path)
+        raise ValueError("The polars backend supports .csv and .parquet files only")
+
+    @staticmethod
+    def _numeric(col, col_type):
+        if col_type == pl.String:
+            return pl.col(col).str.strip_chars().cast(pl.Float64, strict=False)
+        if col_type.is_numeric():
+            return pl.col(col).cast(pl.Float64)
+        return pl.lit(None, dtype=pl.Float64)
+
+    @staticmethod
+    def _iso_datetime(col):
+        """
+        Parse an ISO-8601 text column ("2023-01-15", "2023-01-15 10:00:00",
+        "2023-01-15T10:00:00.123"); one format instead of one parse per form
+        """
+        text = pl.col(col).str.strip_chars()
+        text = pl.when(text.str.len_chars() == 10).then(text + " 00:00:00").otherwise(
+            text.str.replace("T", " ", literal=True))
+        return text.str.to_datetime(ISO_DATETIME_FORMAT, strict=False, time_unit="ns")
+
+    def _nonconforming(self, col, col_type, dtype):
+        present = pl.col(col).is_not_null()
+        if dtype in ("int", "integer"):
+            num = self._numeric(col, col_type)
+            return present & ~(num == num.floor()).fill_null(False)
+        if dtype == "float":
+            return present & self._numeric(col, col_type).is_null()
+        if dtype == "date":
+            if col_type == pl.String:
+                return present & self._iso_datetime(col).is_null()
+            if col_type.is_temporal():
+                return pl.lit(False)
+            # Numbers and booleans are not dates
+            return present
+        # bool / boolean
+        if col_type == pl.Boolean:
+            return pl.lit(False)
+        text = pl.col(col).cast(pl.String).str.strip_chars().str.to_lowercase()
+        return present & ~text.is_in(list(BOOL_VALUES))
+
+    @staticmethod
+    def _text(name, col_type):
+        # Spelled like srs_expressions.column_text
+        col = pl.col(name)
+        if col_type == pl.Boolean:
+            return pl.when(col).then(pl.lit("True")).when(~col).then(pl.lit("False"))
+        if col_type == pl.Date or isinstance(col_type, pl.Datetime):
+            if getattr(col_type, "time_zone", None):
+                col = col.dt.convert_time_zone("UTC").dt.replace_time_zone(None)
+            ts = col.cast(pl.Datetime("us"))
+            return (pl.when(ts == ts.dt.truncate("1d")).then(ts.dt.strftime("%Y-%m-%d"))
+                    .when(ts.dt.microsecond() == 0).then(ts.dt.strftime("%Y-%m-%d %H:%M:%S"))
+                    .otherwise(ts.dt.strftime("%Y-%m-%d %H:%M:%S%.6f")))
+        if col_type == pl.String:
+            lower = col.str.to_lowercase()
+            return (pl.when(lower == "true").then(pl.lit("True"))
+                    .when(lower == "false").then(pl.lit("False")).otherwise(col))
+        if col_type.is_float():
+            integral = (col == col.floor()) & (col.abs() < INTEGRAL_TEXT_LIMIT)
+            return pl.when(integral).then(col.cast(pl.Int64).cast(pl.String)).otherwise(col.cast(pl.String))
+        return col.cast(pl.String)
+
+    def _column_expr(self, schema):
+        def column_expr(name, mode):
+            col_type = schema[name]
+            if mode == "num":
+                return self._numeric(name, col_type)
+            if mode == "str":
+                return self._text(name, col_type)
+            if mode == "date":
+                if col_type == pl.String:
+                    return self._iso_datetime(name)
+                if col_type.is_temporal():
+                    return pl.col(name).cast(pl.Datetime("ns"))
+                return pl.lit(None, dtype=pl.Datetime("ns"))
+            return pl.col(name)
+        return column_expr
+
+    @staticmethod
+    def _column_kind(schema):
+        def column_kind(name):
+            col_type = schema[name]
+            if col_type.is_numeric():
+                return "num"
+            if col_type.is_temporal():
+                return "date"
+            return "str"
+        return column_kind
+
+    def _condition(self, rule, kind, param, schema):
+        if kind == "expression":
+            # Violated where the expression is known to be false
+            return ~expression_to_polars(param, self._column_expr(schema), self._column_kind(schema))
+        col, col_type = rule["column"], schema[rule["column"]]
+        if kind == "required":
+            return pl.col(col).is_null()
+        if kind == "type":
+            return self._nonconforming(col, col_type, rule["type"])
+        num = self._numeric(col, col_type)
+        return num < param if kind == "min" else num > param
+
+    def _run(self, rules, frame):
+        schema = frame.collect_schema()
+
+        conditions = []
+        keys = []
+        for rule in rules:
+            for error, kind, param in plan_rule(rule, schema.names())[1]:
+                conditions.append(self._condition(rule, kind, param, schema).fill_null(False))
+                keys.append((rule["label"], error))
+
+        aggregations = [pl.len().alias("__rows")]
+        aggregations += [condition.sum().alias(f"__count_{i}") for i, condition in enumerate(conditions)]
+        counts = frame.select(aggregations).collect().row(0, named=True)
+
+        failing = [i for i in range(len(keys)) if counts[f"__count_{i}"]]
+        indexed = frame.with_row_index("__row")
+        samples = pl.collect_all([indexed.filter(conditions[i]).select("__row").head(SAMPLE_ROWS)
+                                  for i in failing])
+        sample_rows = {i: sample["__row"].to_list() for i, sample in zip(failing, samples)}
+
+        stats = {key: (counts[f"__count_{i}"], sample_rows.get(i, [])) for i, key in enumerate(keys)}
+        return _assemble_results(rules, list(schema.names()), counts["__rows"], stats)
+
+    def validate(self, path, srs_df, sheet_name=None):
+        rules = compile_srs_rules(srs_df)
+        file_format = _file_format(path)
+        try:
+            return self._run(rules, self._frame(path, file_format))
+        except pl.exceptions.ComputeError:
+            if file_format != "csv":
+                raise
+            # A value past the inferred rows does not fit its inferred type
+            return self._run(rules, self._frame(path, file_format, infer_schema=False))
+
+
+BACKENDS = {
+    "pandas": (PandasBackend, True),
+    "duckdb": (DuckDBBackend, DUCKDB_AVAILABLE),
+    "polars": (PolarsBackend, POLARS_AVAILABLE),
+}
+
+
+def available_backends():
+    return [name for name, (_, available) in BACKENDS.items() if available]
+
+
+def get_backend(name="pandas", **options):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown validation backend: {name}. Choose from {', '.join(BACKENDS)}.")
+    backend_class, available = BACKENDS[name]
+    if not available:
+        raise ValueError(f"Validation backend '{name}' is not installed (pip install {name}).")
+    return backend_class(**options)
+
+
+def validate_file_against_srs(path, srs_df, backend="pandas", sheet_name=0):
+    """
+    Validate a CSV/Parquet (or, with pandas, Excel) file against SRS rules
+    with the chosen backend. Returns (result_summary, failed_rules).
+    """
+    return get_backend(backend).validate(path, srs_df, sheet_name=sheet_name)
@@ -0,0 +1,431 @@
+"""
+Fast XLSX inspection without loading any sheet.
+
+inspect_xlsx reads the workbook straight from the XLSX zip: sheet names
+from xl/workbook.xml (and its relationships), the used range from each
+sheet's <dimension> element and the header row from row 1 (and, for date
+headers, the number formats in xl/styles.xml). Sheet XML is parsed as a
+decompressing stream and abandoned after the header row, and only the
+shared strings the headers refer to are resolved, so inspection takes
+milliseconds regardless of the workbook's size.
+"""
+
+import datetime
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+CELL_REF = re.compile(r"^\$?([A-Za-z]{1,3})\$?(\d+)$")
+
+# Built-in number formats that display dates or times, and the parts of a
+# custom format code that are not date/time tokens (quoted text, colors)
+DATE_FORMAT_IDS = {14, 15, 16, 17, 18, 19, 20, 21, 22, 45, 46, 47}
+ELAPSED_FORMAT_IDS = {46}
+FORMAT_LITERAL = re.compile(r'".*?"|\[(?!hh?\]|mm?\]|ss?\])[^\]]*\]')
+DATE_TOKEN = re.compile(r"(?<![_\\])[dmhysDMHYS]")
+ELAPSED_TOKEN = re.compile(r"\[hh?\](:mm(:ss(\.0*)?)?)?|\[mm?\](:ss(\.0*)?)?|\[ss?\](\.0*)?")
+WINDOWS_EPOCH = datetime.datetime(1899, 12, 30)
+MAC_EPOCH = datetime.datetime(1904, 1, 1)
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def column_index(letters):
+    """
+    0-based column index of a column name ("A" -> 0, "AA" -> 26)
+    """
+    index = 0
+    for letter in letters.upper():
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index - 1
+
+
+def parse_cell_ref(ref):
+    """
+    (row, column) of a cell reference, both 0-based ("B3" -> (2, 1))
+    """
+    match = CELL_REF.match(ref.strip())
+    if not match:
+        raise ValueError(f"Invalid cell reference: {ref}")
+    return int(match.group(2)) - 1, column_index(match.group(1))
+
+
+def parse_dimension(ref):
+    """
+    ((first_row, first_col), (last_row, last_col)) of a range such as
+    "A1:F100" (0-based, inclusive)
+    """
+    first, _, last = ref.partition(":")
+    start = parse_cell_ref(first)
+    return start, parse_cell_ref(last) if last else start
+
+
+class SharedStringRef(int):
+    """
+    Index into the shared string table, resolved after all header rows are
+    read
+    """
+
+
+class _SharedStrings:
+    """
+    Lazily resolved shared string table. resolve() streams the part once,
+    up to the highest requested index, and parses only the requested items:
+    the rest are skipped by splitting the raw XML on </si>.
+    """
+
+    BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, archive, path):
+        self.archive = archive
+        self.path = path
+        self.strings = {}
+
+    def resolve(self, indices):
+        needed = {int(i) for i in indices} - set(self.strings)
+        if not needed or self.path is None:
+            return
+        last = max(needed)
+        index = 0
+        pending = b""
+        with self.archive.open(self.path) as stream:
+            while index <= last:
+                block = stream.read(self.BLOCK_SIZE)
+                if not block:
+                    break
+                segments = (pending + block).split(b"</si>")
+                pending = segments.pop()
+                for segment in segments:
+                    # Empty items may be written self-closed and have no </si>
+                    index += segment.count(b"<si/>")
+                    if index in needed:
+                        item = segment[segment.rfind(b"<si"):]
+                        item = item.replace(b"<si", f'<si xmlns="{MAIN_NS}"'.encode(), 1) + b"</si>"
+                        self.strings[index] = _string_item_text(ET.fromstring(item))
+                    index += 1
+                    if index > last:
+                        break
+        for missing in needed - set(self.strings):
+            self.strings[missing] = ""
+
+    def get(self, index):
+        if int(index) not in self.strings:
+            self.resolve([index])
+        return self.strings.get(int(index))
+
+
+def _string_item_text(item):
+    """
+    Text of a shared/inline string item: plain <t> or concatenated rich text
+    runs (<r><t>), skipping phonetic runs (<rPh>)
+    """
+    parts = []
+    for child in item:
+        tag = _local(child.tag)
+        if tag == "t":
+            parts.append(child.text or "")
+        elif tag == "r":
+            parts.extend(t.text or "" for t in child if _local(t.tag) == "t")
+    return "".join(parts)
+
+
+def dedup_headers(headers):
+    """
+    Name header cells the way pandas.read_excel does: blank ones (None or
+    "") become "Unnamed: i", and repeats get ".1", ".2", ... suffixes that
+    skip names already in the row. Given names are numbered before the
+    blank ones, so an explicit "Unnamed: 3" keeps its name.
+    """
+    headers = list(headers)
+    unnamed = [i for i, name in enumerate(headers) if name is None or name == ""]
+    for i in unnamed:
+        headers[i] = f"Unnamed: {i}"
+    taken = set(headers)
+    named = [i for i in range(len(headers)) if i not in set(unnamed)]
+    counts = defaultdict(int)
+    for i in named + unnamed:
+        name = original = headers[i]
+        count = counts[name]
+        while count > 0:
+            counts[original] = count + 1
+            name = f"{original}.{count}"
+            count = count + 1 if name in taken else counts[name]
+        headers[i] = name
+        counts[name] = count + 1
+    return headers
+
+
+def _date_format(code):
+    """
+    "date" or "elapsed" for a number format code that displays a date/time
+    or a duration ([h]:mm), else None. Only the positive section counts.
+    """
+    code = code.split(";")[0]
+    if ELAPSED_TOKEN.search(code):
+        return "elapsed"
+    return "date" if DATE_TOKEN.search(FORMAT_LITERAL.sub("", code)) else None
+
+
+def _date_styles(archive, path):
+    """
+    Map of cell style index (position in cellXfs) to "date"/"elapsed" for
+    the styles whose number format displays dates or durations
+    """
+    if path is None or path not in archive.namelist():
+        return {}
+    custom = {}
+    formats = []
+    in_cell_xfs = False
+    with archive.open(path) as stream:
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            tag = _local(elem.tag)
+            if tag == "cellXfs":
+                in_cell_xfs = event == "start"
+            elif event == "end" and tag == "numFmt":
+                custom[int(elem.get("numFmtId", -1))] = elem.get("formatCode", "")
+            elif event == "end" and tag == "xf" and in_cell_xfs:
+                formats.append(int(elem.get("numFmtId", 0)))
+    styles = {}
+    for index, format_id in enumerate(formats):
+        if format_id in custom:
+            kind = _date_format(custom[format_id])
+        elif format_id in DATE_FORMAT_IDS:
+            kind = "elapsed" if format_id in ELAPSED_FORMAT_IDS else "date"
+        else:
+            kind = None
+        if kind:
+            styles[index] = kind
+    return styles
+
+
+def from_excel(serial, epoch=WINDOWS_EPOCH, elapsed=False):
+    """
+    Python value of a date-formatted number, as openpyxl converts it: a
+    timedelta for durations, a time for fractions of a day, else a
+    datetime (serials below 60 skip the 1900 leap-year bug)
+    """
+    if elapsed:
+        duration = datetime.timedelta(days=serial)
+        if duration.microseconds:
+            duration = datetime.timedelta(seconds=duration.total_seconds() // 1,
+                                          microseconds=round(duration.microseconds, -3))
+        return duration
+    day, fraction = divmod(serial, 1)
+    time = datetime.timedelta(milliseconds=round(fraction * 86400 * 1000))
+    if 0 <= serial < 1 and time.days == 0:
+        hours, seconds = divmod(time.seconds, 3600)
+        return datetime.time(hours, seconds // 60, seconds % 60, time.microseconds)
+    if 0 < serial < 60 and epoch == WINDOWS_EPOCH:
+        day += 1
+    return epoch + datetime.timedelta(days=day) + time
+
+
+def _has_value(cell):
+    return cell.find(f"{{{MAIN_NS}}}v") is not None or cell.get("t") == "inlineStr"
+
+
+def _cell_value(cell, date_styles, epoch):
+    cell_type = cell.get("t", "n")
+    if cell_type == "inlineStr":
+        item = cell.find(f"{{{MAIN_NS}}}is")
+        return None if item is None else _string_item_text(item)
+    value = cell.find(f"{{{MAIN_NS}}}v")
+    if value is None or value.text is None:
+        return None
+    if cell_type == "s":
+        return SharedStringRef(value.text)
+    if cell_type == "b":
+        return value.text == "1"
+    if cell_type == "str":
+        return value.text
+    if cell_type == "e":
+        # pandas reads error cells as NaN
+        return None
+    if cell_type == "d":
+        return datetime.datetime.fromisoformat(value.text.rstrip("Z"))
+    number = float(value.text)
+    kind = date_styles.get(int(cell.get("s", 0)))
+    if kind:
+        try:
+            return from_excel(number, epoch, elapsed=kind == "elapsed")
+        except (OverflowError, ValueError):
+            return None
+    return int(number) if number.is_integer() else number
+
+
+def _workbook_sheets(archive):
+    rels_path = "xl/_rels/workbook.xml.rels"
+    targets = {}
+    shared_strings_path = None
+    styles_path = "xl/styles.xml"
+    if rels_path in archive.namelist():
+        with archive.open(rels_path) as stream:
+            for _, elem in ET.iterparse(stream, events=("end",)):
+                if _local(elem.tag) != "Relationship":
+                    continue
+                target = elem.get("Target", "")
+                path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+                targets[elem.get("Id")] = path
+                if elem.get("Type", "").endswith("/sharedStrings"):
+                    shared_strings_path = path
+                elif elem.get("Type", "").endswith("/styles"):
+                    styles_path = path
+
+    sheets = []
+    epoch = WINDOWS_EPOCH
+    with archive.open("xl/workbook.xml") as stream:
+        for _, elem in ET.iterparse(stream, events=("end",)):
+            if _local(elem.tag) == "workbookPr" and elem.get("date1904") in ("1", "true"):
+                epoch = MAC_EPOCH
+            elif _local(elem.tag) == "sheet":
+                rel_id = elem.get(f"{{{REL_NS}}}id")
+                sheets.append({
+                    "name": elem.get("name"),
+                    "state": elem.get("state", "visible"),
+                    "path": targets.get(rel_id),
+                })
+    if shared_strings_path is None and "xl/sharedStrings.xml" in archive.namelist():
+        shared_strings_path = "xl/sharedStrings.xml"
+    return sheets, shared_strings_path, styles_path, epoch
+
+
+def _inspect_sheet(archive, path, count_rows, date_styles, epoch):
+    """
+    Stream one worksheet part: the <dimension> ref and the first row with
+    cells (with its values when it is row 1, the header), plus (when
+    count_rows or the dimension is missing) a scan of the remaining rows
+    for the used range
+    """
+    dimension = None
+    header = None
+    first_row = last_row = None
+    first_col = last_col = None
+    sheet_data = None
+
+    with archive.open(path) as stream:
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            tag = _local(elem.tag)
+            if event == "start":
+                if tag == "dimension":
+                    dimension = elem.get("ref")
+                elif tag == "sheetData":
+                    sheet_data = elem
+                continue
+            if tag != "row":
+                if tag == "sheetData" or tag == "worksheet":
+                    break
+                continue
+
+            cells = {}
+            position = 0
+            row_number = int(elem.get("r")) - 1 if elem.get("r") else (last_row + 1 if last_row is not None else 0)
+            for cell in elem.iter(f"{{{MAIN_NS}}}c"):
+                ref = cell.get("r")
+                position = parse_cell_ref(ref)[1] if ref else position
+                if header is None and row_number == 0:
+                    if _has_value(cell):
+                        cells[position] = _cell_value(cell, date_styles, epoch)
+                elif _has_value(cell):
+                    cells[position] = True
+                position += 1
+            # Drop parsed rows so a full scan runs in constant memory
+            if sheet_data is not None:
+                sheet_data.clear()
+            if not cells:
+                continue
+
+            if header is None:
+                header = cells if row_number == 0 else {}
+            first_row = row_number if first_row is None else first_row
+            last_row = row_number
+            first_col = min(cells) if first_col is None else min(first_col, min(cells))
+            last_col = max(cells) if last_col is None else max(last_col, max(cells))
+            if dimension and not count_rows:
+                break
+
+    if count_rows or not dimension:
+        used = None if first_row is None else ((first_row, first_col), (last_row, last_col))
+    else:
+        used = parse_dimension(dimension)
+        # A single-cell dimension of an empty sheet ("A1") has no data
+        if header is None:
+            used = None
+    return dimension, used, header
+
+
+def inspect_xlsx(source, count_rows=False):
+    """
+    Inspect an .xlsx workbook (a path or seekable binary file object)
+    without loading it. Returns one dict per sheet, in workbook order:
+
+        name, state ("visible"/"hidden"/"veryHidden"), dimension (the
+        sheet's declared range, or None), rows (data rows below the header),
+        columns, headers (header names as pandas.read_excel would name them)
+
+    As in pandas.read_excel, the header is row 1 and columns start at A
+    even when the used range starts further in: data at B3:G6 gives 5 rows,
+    7 columns and all-"Unnamed" headers. Date-formatted header cells come
+    back as datetime/time/timedelta values, not serial numbers.
+
+    The row and column counts come from the declared dimension; with
+    count_rows=True (or when a sheet declares none) the sheet's rows are
+    scanned instead. Chart sheets and other non-worksheet parts get rows
+    and columns of 0. Raises ValueError for files that are not XLSX.
+    """
+    with _open_workbook(source) as archive:
+        sheets, shared_strings_path, styles_path, epoch = _workbook_sheets(archive)
+        names = set(archive.namelist())
+        date_styles = _date_styles(archive, styles_path)
+
+        result = []
+        for sheet in sheets:
+            info = {"name": sheet["name"], "state": sheet["state"], "dimension": None,
+                    "rows": 0, "columns": 0, "headers": []}
+            path = sheet["path"]
+            if path in names and "worksheets/" in path:
+                try:
+                    dimension, used, header = _inspect_sheet(archive, path, count_rows, date_styles, epoch)
+                except ET.ParseError as e:
+                    raise ValueError(f"Malformed sheet XML for '{sheet['name']}': {e}")
+                info["dimension"] = dimension
+                if used is not None:
+                    last_row, last_col = used[1]
+                    last_col = max([last_col, *header])
+                    info["rows"] = last_row
+                    info["columns"] = last_col + 1
+                    info["headers"] = [header.get(col) for col in range(last_col + 1)]
+            result.append(info)
+
+        # One pass over the shared strings for the headers of all sheets
+        shared_strings = _SharedStrings(archive, shared_strings_path)
+        shared_strings.resolve(h for info in result for h in info["headers"] if isinstance(h, SharedStringRef))
+        for info in result:
+            info["headers"] = dedup_headers(shared_strings.get(h) if isinstance(h, SharedStringRef) else h
+                                            for h in info["headers"])
+    return result
+
+
+def _open_workbook(source):
+    try:
+        archive = zipfile.ZipFile(source)
+    except (zipfile.BadZipFile, OSError) as e:
+        raise ValueError(f"Not an XLSX workbook: {e}")
+    if "xl/workbook.xml" not in archive.namelist():
+        archive.close()
+        raise ValueError("Not an XLSX workbook: xl/workbook.xml is missing")
+    return archive
+
+
+def sheet_names(source):
+    """
+    Sheet names of an .xlsx workbook, in workbook order
+    """
+    with _open_workbook(source) as archive:
+        return [sheet["name"] for sheet in _workbook_sheets(archive)[0]]